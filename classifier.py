@@ -1,14 +1,31 @@
+import os
 import re
 import json
+import heapq
+import hashlib
+import pickle
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 from loguru import logger
 
 from models import Article, KeywordRule
 from config import settings
 
+try:
+    import ahocorasick  # pyahocorasick (optional): one pass over the text for all keywords
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2  # google-re2 (optional, not in requirements): faster prefilter when pyahocorasick is missing
+except ImportError:
+    re2 = None
+
 class NewsSection(Enum):
     INDICADORES = "Indicadores Económicos"
     ACAFI = "ACAFI"
@@ -25,14 +42,30 @@ class ClassificationResult:
     is_partner_new_fund: bool
     mentions_acafi: bool
 
+KEYWORDS_CACHE_DIR = settings.DATA_DIR / "keywords_cache"
+
+# Distinct article texts whose classification is memoized per classifier
+CLASSIFY_CACHE_SIZE = 1024
+
 class NewsClassifier:
     def __init__(self, keywords_file: str = None):
         self.keywords_file = keywords_file or settings.KEYWORDS_FILE
         self.keyword_rules = self._load_keywords()
+        self.rule_table = self._build_rule_table()
+        self.plain_rules = self._plain_keyword_rules()
+        self.keyword_automaton = self._build_keyword_automaton()
+        self.keyword_prefilter = None if self.keyword_automaton else self._build_keyword_prefilter()
         self.section_patterns = self._compile_patterns()
+        # Per-instance memo: identical text (repeated feeds, reruns) is classified once
+        self._classify_text = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify_text)
         
     def _load_keywords(self) -> Dict[str, List[KeywordRule]]:
         """Load keywords from Excel file"""
+        cache_file = self._keywords_cache_file()
+        cached = self._load_cached_rules(cache_file)
+        if cached is not None:
+            return cached
+        
         try:
             df = pd.read_excel(self.keywords_file, sheet_name=settings.CLIENT_NAME)
             rules = {}
@@ -61,12 +94,48 @@ class NewsClassifier:
                         'pattern': self._create_pattern(keywords)
                     })
             
+            self._save_cached_rules(cache_file, rules)
             return rules
             
         except Exception as e:
             logger.error(f"Error loading keywords: {e}")
             return self._get_default_keywords()
     
+    def _keywords_cache_file(self) -> Optional[Path]:
+        """Pickle path for the parsed workbook, named after a blake2b hash of its contents and sheet"""
+        digest = hashlib.blake2b(settings.CLIENT_NAME.encode('utf-8'), digest_size=16)
+        try:
+            with open(self.keywords_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return KEYWORDS_CACHE_DIR / f"{digest.hexdigest()}.pkl"
+    
+    def _load_cached_rules(self, cache_file: Optional[Path]) -> Optional[Dict[str, List[KeywordRule]]]:
+        """Load parsed rules pickled from an identical workbook, if any"""
+        if cache_file is None or not cache_file.exists():
+            return None
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable keywords cache: {e}")
+            return None
+    
+    def _save_cached_rules(self, cache_file: Optional[Path], rules: Dict[str, List[KeywordRule]]):
+        """Persist parsed rules so the next run skips the Excel parse"""
+        if cache_file is None:
+            return
+        
+        try:
+            KEYWORDS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(rules, f)
+        except OSError as e:
+            logger.debug(f"Could not write keywords cache: {e}")
+    
     def _parse_keywords(self, keywords_str: str) -> List[str]:
         """Parse keyword string into list"""
         # Remove quotes and split by pipe
@@ -81,6 +150,72 @@ class NewsClassifier:
         pattern_str = '|'.join(escaped_keywords)
         return re.compile(pattern_str, re.IGNORECASE)
     
+    @staticmethod
+    def _target_section(section_name: str) -> Optional[NewsSection]:
+        """Map a keywords-sheet section name to the newsletter section it feeds"""
+        if 'Indicadores' in section_name:
+            return NewsSection.INDICADORES
+        if 'ACAFI' in section_name.upper():
+            return NewsSection.ACAFI
+        if 'Industria' in section_name:
+            return NewsSection.INDUSTRIA
+        if 'Interés' in section_name:
+            return NewsSection.INTERES
+        return None
+    
+    def _build_rule_table(self) -> List[Tuple[Optional[NewsSection], re.Pattern, List[str], str]]:
+        """Flatten keyword rules once so classify() does no per-rule string checks"""
+        table = []
+        for section_name, rules in self.keyword_rules.items():
+            target = self._target_section(section_name)
+            for rule in rules:
+                table.append((target, rule['pattern'], rule['keywords'], rule['theme']))
+        return table
+    
+    def _plain_keyword_rules(self) -> frozenset:
+        """Indices of rule-table entries whose pattern is just their escaped keywords
+        
+        Rules with a custom regex, such as the defaults, always use pattern.search.
+        """
+        return frozenset(
+            index
+            for index, (_, pattern, keywords, _) in enumerate(self.rule_table)
+            if keywords and pattern.pattern == '|'.join(re.escape(k) for k in keywords)
+        )
+    
+    def _build_keyword_automaton(self):
+        """Aho-Corasick automaton over the plain-keyword rules; values are rule-table indices"""
+        if ahocorasick is None or not self.plain_rules:
+            return None
+        
+        rules_by_keyword: Dict[str, List[int]] = {}
+        for index in sorted(self.plain_rules):
+            for keyword in self.rule_table[index][2]:
+                rules_by_keyword.setdefault(keyword.lower(), []).append(index)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, indices in rules_by_keyword.items():
+            automaton.add_word(keyword, indices)
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_keyword_prefilter(self):
+        """Single alternation of every plain keyword, used to skip all plain rules on a miss
+        
+        Compiled with re2 when installed, otherwise with re.
+        """
+        if not self.plain_rules:
+            return None
+        
+        keywords = {k for index in self.plain_rules for k in self.rule_table[index][2]}
+        alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+        if re2 is not None:
+            try:
+                return re2.compile(f'(?i)(?:{alternation})')
+            except Exception as e:
+                logger.debug(f"re2 could not compile keyword prefilter, using re: {e}")
+        return re.compile(alternation, re.IGNORECASE)
+    
     def _compile_patterns(self) -> Dict[str, re.Pattern]:
         """Compile regex patterns for each section"""
         patterns = {}
@@ -147,10 +282,23 @@ class NewsClassifier:
         
         return patterns
     
+    @staticmethod
+    def _article_text(article: Article) -> str:
+        """Text the classifier looks at"""
+        return f"{article.title} {article.subtitle or ''} {article.content or ''}"
+    
     def classify(self, article: Article) -> ClassificationResult:
         """Classify an article into sections"""
-        text = f"{article.title} {article.subtitle or ''} {article.content or ''}"
-        
+        result = self._classify_text(self._article_text(article))
+        # Cached results are shared: hand out fresh lists
+        return replace(
+            result,
+            matched_keywords=list(result.matched_keywords),
+            sector_tags=list(result.sector_tags)
+        )
+    
+    def _classify_text(self, text: str) -> ClassificationResult:
+        """Classify the combined title/subtitle/content text"""
         # Check for ACAFI mentions
         mentions_acafi = bool(self.section_patterns['acafi'].search(text))
         
@@ -170,24 +318,36 @@ class NewsClassifier:
             matched_keywords.append("ACAFI")
         
         # Priority 2: Check keyword rules
-        for section_name, rules in self.keyword_rules.items():
-            for rule in rules:
-                if rule['pattern'].search(text):
-                    matched_keywords.extend(rule['keywords'])
-                    
-                    if 'Indicadores' in section_name:
-                        section = NewsSection.INDICADORES
-                        confidence = 0.9
-                    elif 'ACAFI' in section_name.upper():
-                        section = NewsSection.ACAFI
-                        confidence = max(confidence, 0.9)
-                    elif 'Industria' in section_name:
-                        section = NewsSection.INDUSTRIA
-                        confidence = max(confidence, 0.85)
-                        sector_tags.append(rule['theme'])
-                    elif 'Interés' in section_name:
-                        section = NewsSection.INTERES
-                        confidence = max(confidence, 0.8)
+        # hits is None when the plain rules must be checked one by one
+        hits = None
+        if self.keyword_automaton is not None:
+            hits = set()
+            for _, indices in self.keyword_automaton.iter(text.lower()):
+                hits.update(indices)
+        elif self.keyword_prefilter is not None and self.keyword_prefilter.search(text) is None:
+            hits = set()  # no workbook keyword occurs in the text
+        
+        for index, (target, pattern, keywords, theme) in enumerate(self.rule_table):
+            if hits is not None and index in self.plain_rules:
+                matched = index in hits
+            else:
+                matched = pattern.search(text) is not None
+            if matched:
+                matched_keywords.extend(keywords)
+                
+                if target is NewsSection.INDICADORES:
+                    section = NewsSection.INDICADORES
+                    confidence = 0.9
+                elif target is NewsSection.ACAFI:
+                    section = NewsSection.ACAFI
+                    confidence = max(confidence, 0.9)
+                elif target is NewsSection.INDUSTRIA:
+                    section = NewsSection.INDUSTRIA
+                    confidence = max(confidence, 0.85)
+                    sector_tags.append(theme)
+                elif target is NewsSection.INTERES:
+                    section = NewsSection.INTERES
+                    confidence = max(confidence, 0.8)
         
         # Check for partner new fund (special case)
         if is_partner_new_fund and not mentions_acafi:
@@ -217,6 +377,25 @@ class NewsClassifier:
             mentions_acafi=mentions_acafi
         )
     
+    def classify_many(self, articles: List[Article]) -> List[ClassificationResult]:
+        """Classify several articles concurrently, preserving input order"""
+        if len(articles) < 2:
+            return [self.classify(article) for article in articles]
+        
+        if len(articles) >= settings.CLASSIFIER_PROCESS_THRESHOLD:
+            # Regex matching holds the GIL: large batches go to worker processes.
+            # Only the texts are sent; each worker builds its own classifier.
+            texts = [self._article_text(article) for article in articles]
+            with ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                initializer=_init_worker_classifier,
+                initargs=(self.keywords_file,)
+            ) as executor:
+                return list(executor.map(_classify_in_worker, texts, chunksize=32))
+        
+        with ThreadPoolExecutor(max_workers=settings.CLASSIFIER_MAX_WORKERS) as executor:
+            return list(executor.map(self.classify, articles))
+    
     def _get_default_keywords(self) -> Dict[str, List[Dict]]:
         """Return default keywords if file cannot be loaded"""
         return {
@@ -234,18 +413,43 @@ class NewsClassifier:
             }]
         }
     
+    @staticmethod
+    def _priority_key(item: Tuple[Article, ClassificationResult]) -> tuple:
+        """Sort key used to rank articles within a section"""
+        article, result = item
+        return (
+            result.mentions_acafi,  # ACAFI mentions first
+            result.is_partner_new_fund,  # New funds second
+            result.confidence,  # Then by confidence
+            article.published_at  # Most recent
+        )
+    
     def prioritize_articles(self, articles: List[Tuple[Article, ClassificationResult]]) -> List[Tuple[Article, ClassificationResult]]:
         """Prioritize articles within each section"""
         # Sort by confidence and relevance
-        prioritized = sorted(
-            articles,
-            key=lambda x: (
-                x[1].mentions_acafi,  # ACAFI mentions first
-                x[1].is_partner_new_fund,  # New funds second
-                x[1].confidence,  # Then by confidence
-                x[0].published_at  # Most recent
-            ),
-            reverse=True
-        )
+        prioritized = sorted(articles, key=self._priority_key, reverse=True)
         
-        return prioritized
\ No newline at end of file
+        return prioritized
+    
+    def top_articles(
+        self,
+        articles: List[Tuple[Article, ClassificationResult]],
+        limit: int
+    ) -> List[Tuple[Article, ClassificationResult]]:
+        """Return the `limit` highest-priority articles without sorting the whole section"""
+        return heapq.nlargest(limit, articles, key=self._priority_key)
+
+_worker_classifier: Optional[NewsClassifier] = None
+
+def _init_worker_classifier(keywords_file):
+    """ProcessPoolExecutor initializer: build the classifier once per worker"""
+    global _worker_classifier
+    _worker_classifier = NewsClassifier(keywords_file=keywords_file)
+
+def _classify_in_worker(text: str) -> ClassificationResult:
+    return _worker_classifier._classify_text(text)
+
+@lru_cache(maxsize=None)
+def get_classifier(keywords_file: Optional[str] = None) -> NewsClassifier:
+    """Shared NewsClassifier per keywords file, built once per process"""
+    return NewsClassifier(keywords_file=keywords_file)
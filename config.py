@@ -34,6 +34,13 @@ class Settings(BaseSettings):
     LLM_MODEL: str = Field(default="gpt-4-turbo-preview", description="Default LLM model")
     LLM_TEMPERATURE: float = Field(default=0.3, description="LLM temperature")
     LLM_MAX_TOKENS: int = Field(default=2000, description="Max tokens for LLM responses")
+    LLM_MAX_CONCURRENCY: int = Field(default=8, description="Max concurrent LLM summary requests")
+    LLM_TIMEOUT_SECONDS: float = Field(default=60, description="Base timeout for local LLM requests")
+    LLM_TIMEOUT_PER_TOKEN_SECONDS: float = Field(
+        default=0.05,
+        description="Extra timeout per requested token, so batched prompts get time to finish"
+    )
+    EMBEDDING_MODEL: str = Field(default="all-MiniLM-L6-v2", description="SentenceTransformer model for semantic checks")
     
     # Mailchimp Configuration
     MAILCHIMP_API_KEY: Optional[SecretStr] = Field(default=None, env="MAILCHIMP_API_KEY")
@@ -81,6 +88,11 @@ class Settings(BaseSettings):
         description="Path to keywords Excel file"
     )
     CLIENT_NAME: str = Field(default="ACAFI", description="Client name for keywords sheet")
+    CLASSIFIER_MAX_WORKERS: int = Field(default=8, description="Worker threads for batch classification")
+    CLASSIFIER_PROCESS_THRESHOLD: int = Field(
+        default=500,
+        description="Batch size from which classification runs in worker processes instead of threads"
+    )
     
     # Content Filtering
     DUPLICATE_THRESHOLD: float = Field(default=0.85, description="Similarity threshold for duplicates")
@@ -102,6 +114,10 @@ class Settings(BaseSettings):
     # Cache Configuration
     CACHE_TTL_SECONDS: int = Field(default=900, description="Cache TTL in seconds (15 minutes)")
     ENABLE_CACHE: bool = Field(default=True, description="Enable caching")
+    INDICATORS_CACHE_TTL_SECONDS: int = Field(
+        default=86400,
+        description="TTL for cached Banco Central indicators (published daily)"
+    )
     
     class Config:
         env_file = ".env"
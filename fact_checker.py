@@ -3,11 +3,13 @@ Sistema de verificación de hechos y prevención de alucinaciones
 """
 import re
 import json
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Callable, List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 
+import numpy as np
+
 from models import Article
 from classifier import NewsSection
 
@@ -19,10 +21,32 @@ class FactCheckResult:
     evidence: Dict[str, str]
     suggestions: List[str]
 
+@dataclass
+class SourceIndex:
+    """Embeddings de los artículos fuente en una matriz contigua (K, d)"""
+    articles: List[Article]
+    emb: np.ndarray  # float32, filas normalizadas L2
+
 class FactChecker:
     """Verificador de hechos para prevenir alucinaciones del LLM"""
     
-    def __init__(self):
+    # Similitud coseno mínima para considerar una oración respaldada por una fuente
+    SUPPORT_THRESHOLD = 0.87
+    # Fracción de tokens de la oración presentes en las fuentes
+    OVERLAP_SUPPORTED = 0.7
+    OVERLAP_SUSPICIOUS = 0.3
+    
+    def __init__(
+        self,
+        embedder: Optional[Any] = None,
+        embedder_loader: Optional[Callable[[], Optional[Any]]] = None
+    ):
+        # Modelo de embeddings compartido (SentenceTransformer) para respaldar oraciones del
+        # editorial con sus fuentes; None omite esa búsqueda. Con embedder_loader el modelo se
+        # carga recién cuando una oración ambigua lo necesita.
+        self.embedder = embedder
+        self.embedder_loader = embedder_loader
+        
         self.suspicious_patterns = [
             r'\b(?:anunció|confirmó|declaró|reveló)\b.*\b(?:ayer|hoy|esta mañana|esta tarde)\b',
             r'\b\d{3,}\s*(?:millones|mil millones|billones)\b',  # Números muy grandes
@@ -55,6 +79,29 @@ class FactChecker:
         # Dividir el editorial en oraciones
         sentences = self._split_into_sentences(editorial)
         
+        # Prefiltro barato por solapamiento de tokens; solo los casos ambiguos se embeben
+        source_tokens = self._source_tokens(articles)
+        ambiguous = []
+        for sentence in sentences:
+            overlap = self._token_overlap(sentence, source_tokens)
+            if overlap > self.OVERLAP_SUPPORTED:
+                evidence[sentence[:50]] = f"Solapamiento con fuentes: {overlap:.0%}"
+            elif overlap < self.OVERLAP_SUSPICIOUS:
+                issues.append(f"Oración sin respaldo en fuentes: '{sentence[:50]}...'")
+            else:
+                ambiguous.append(sentence)
+        
+        # Buscar la fuente que respalda cada oración ambigua (requiere embedder; sin él no se juzgan)
+        source_index = self._build_source_index(articles) if ambiguous else None
+        if source_index is not None:
+            matches = self._match_sources(ambiguous, source_index)
+            for sentence, match in zip(ambiguous, matches):
+                if match is not None:
+                    article, score = match
+                    evidence[sentence[:50]] = f"{article.source}: {article.title} ({score:.2f})"
+                else:
+                    issues.append(f"Oración sin fuente que la respalde: '{sentence[:50]}...'")
+        
         for sentence in sentences:
             # 1. Verificar que las entidades mencionadas existen en los artículos
             entities_valid, entity_issues = self._verify_entities(sentence, articles)
@@ -329,8 +376,68 @@ class FactChecker:
         
         return True
     
+    def _embed(self, texts: List[str]):
+        """Codificar textos en un solo batch con el embedder inyectado"""
+        return self.embedder.encode(
+            texts,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+    
+    def _source_tokens(self, articles: List[Article]) -> frozenset:
+        """Conjunto de tokens de todos los artículos fuente"""
+        all_content = ' '.join([
+            f"{a.title} {a.subtitle or ''} {a.content or ''}"
+            for a in articles
+        ])
+        return frozenset(re.findall(r'\w+', all_content.lower()))
+    
+    def _token_overlap(self, sentence: str, source_tokens: frozenset) -> float:
+        """Fracción de tokens de la oración que aparecen en las fuentes"""
+        claim_tokens = frozenset(re.findall(r'\w+', sentence.lower()))
+        return len(claim_tokens & source_tokens) / max(1, len(claim_tokens))
+    
+    def _build_source_index(self, articles: List[Article]) -> Optional[SourceIndex]:
+        """Embeber todos los artículos fuente en un solo batch"""
+        if self.embedder is None and self.embedder_loader is not None:
+            self.embedder = self.embedder_loader()
+            self.embedder_loader = None  # Un solo intento de carga
+        if self.embedder is None or not articles:
+            return None
+        
+        texts = [f"{a.title} {a.subtitle or ''} {a.content or ''}" for a in articles]
+        emb = np.ascontiguousarray(self._embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        emb /= np.maximum(norms, 1e-12)
+        return SourceIndex(articles=articles, emb=emb)
+    
+    def _match_sources(
+        self,
+        sentences: List[str],
+        index: SourceIndex
+    ) -> List[Optional[Tuple[Article, float]]]:
+        """Encontrar la fuente más similar a cada oración con un único producto matricial"""
+        if not sentences:
+            return []
+        
+        queries = np.asarray(self._embed(sentences), dtype=np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        sims = queries @ index.emb.T  # (n_oraciones, K)
+        best = sims.argmax(axis=1)
+        
+        matches = []
+        for row, col in enumerate(best):
+            score = float(sims[row, col])
+            if score >= self.SUPPORT_THRESHOLD:
+                matches.append((index.articles[col], score))
+            else:
+                matches.append(None)
+        return matches
+    
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Calcular similitud entre dos textos"""
+        # Siempre SequenceMatcher: el umbral de verify_article_summary está calibrado para esta razón
         return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
     
     def _calculate_confidence(self, issues: List[str], coherence: float) -> float:
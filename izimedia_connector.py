@@ -4,7 +4,7 @@ IMPORTANTE: Este es el PRIMER PASO obligatorio del proceso
 """
 import requests
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import json
 import pandas as pd
@@ -54,6 +54,10 @@ class IziMediaConnector:
         
         # Palabras clave para búsqueda (del archivo Excel)
         self.keyword_rules = self._load_keywords()
+        # Queries de búsqueda precalculadas una vez por regla
+        self.search_queries: List[Tuple[KeywordRule, str]] = [
+            (rule, self._build_search_query(rule)) for rule in self.keyword_rules
+        ]
 
     def _load_keywords(self) -> List[KeywordRule]:
         """Cargar palabras clave, exclusiones y medios desde el Excel oficial"""
@@ -417,8 +421,7 @@ class IziMediaConnector:
                 # PASO 1.4: Buscar con palabras clave
                 logger.info("🔎 Buscando con palabras clave...")
 
-                for rule in self.keyword_rules:
-                    query = self._build_search_query(rule)
+                for rule, query in self.search_queries:
                     if not query:
                         continue
 
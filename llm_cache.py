@@ -0,0 +1,66 @@
+"""
+Caché persistente en disco para respuestas del LLM
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from config import settings
+
+class LLMCache:
+    """Caché SQLite de respuestas del LLM indexada por hash del contenido"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else settings.DATA_DIR / "llm_cache.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Los resúmenes se generan desde varios hilos (asyncio.to_thread)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: object) -> str:
+        """Construir una clave SHA256 a partir de las partes que definen la respuesta"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part or '').encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Obtener una respuesta almacenada, o None si no existe"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        """Guardar una respuesta"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)", (key, value)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def open_cache() -> Optional[LLMCache]:
+    """Abrir la caché si está habilitada en la configuración"""
+    if not settings.ENABLE_CACHE:
+        return None
+    try:
+        return LLMCache()
+    except sqlite3.Error as e:
+        logger.warning(f"No se pudo abrir la caché del LLM: {e}")
+        return None
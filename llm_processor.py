@@ -1,16 +1,42 @@
+import re
 import json
+import asyncio
+import socket
 import requests
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import urlparse
 
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from config import settings
+from llm_cache import LLMCache, open_cache
 from models import Article
 from classifier import NewsSection, ClassificationResult
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+def _dumps(payload: Dict) -> bytes:
+    """Serialize a JSON payload straight to bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+def ollama_up(timeout: float = 0.2) -> bool:
+    """Check that the Ollama server accepts TCP connections on its configured port"""
+    url = urlparse(settings.OLLAMA_URL)
+    try:
+        with socket.create_connection((url.hostname or 'localhost', url.port or 11434), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
 @dataclass
 class SummaryResult:
     editorial_summary: str
@@ -19,11 +45,13 @@ class SummaryResult:
     word_count: int
 
 class LLMProcessor:
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.model = settings.LLM_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
         self.ollama_url = getattr(settings, 'OLLAMA_URL', 'http://localhost:11434') + '/api/generate'
+        # use_cache=False skips the on-disk cache entirely (e.g. latency probes)
+        self.cache = open_cache() if use_cache else None
         
         # Check if we're using Ollama or external API
         if settings.OPENAI_API_KEY:
@@ -97,15 +125,25 @@ class LLMProcessor:
         
         enhanced_prompt = prompt + anti_hallucination_rules
         
+        cache_key = LLMCache.make_key('editorial', self.provider, self.model, enhanced_prompt)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         response = self._call_llm(enhanced_prompt)
         
         # Validate response
         editorial = self._validate_editorial(response)
         
+        self._cache_set(cache_key, editorial, enhanced_prompt, response)
         return editorial
     
     def generate_article_summary(self, article: Article, max_lines: int = 2) -> str:
         """Generate a summary for a single article"""
+        cache_key = self._article_cache_key(article, max_lines)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
         prompt = f"""Resume la siguiente noticia en máximo {max_lines} líneas.
         Mantén solo los hechos más importantes, sin opiniones.
@@ -116,8 +154,88 @@ class LLMProcessor:
         
         Resumen:"""
         
-        summary = self._call_llm(prompt, max_tokens=200)
-        return summary.strip()
+        response = self._call_llm(prompt, max_tokens=200)
+        summary = response.strip()
+        
+        self._cache_set(cache_key, summary, prompt, response)
+        return summary
+    
+    async def agenerate_article_summary(self, article: Article, max_lines: int = 2) -> str:
+        """Async variant of generate_article_summary for use with asyncio.gather"""
+        # The provider clients are synchronous; run the call in a worker thread
+        return await asyncio.to_thread(self.generate_article_summary, article, max_lines)
+    
+    def generate_article_summaries_batch(self, articles: List[Article], max_lines: int = 2) -> List[str]:
+        """Generate summaries for several articles with a single LLM call"""
+        summaries: List[Optional[str]] = [
+            self._cache_get(self._article_cache_key(article, max_lines)) for article in articles
+        ]
+        pending = [i for i, summary in enumerate(summaries) if summary is None]
+        if len(pending) <= 1:
+            return [
+                summary if summary is not None else self.generate_article_summary(article, max_lines)
+                for article, summary in zip(articles, summaries)
+            ]
+        
+        articles_block = "\n\n".join(
+            f"""ARTÍCULO {n}:
+        Título: {articles[i].title}
+        Subtítulo: {articles[i].subtitle or 'N/A'}
+        Contenido: {articles[i].content[:1000] if articles[i].content else 'N/A'}"""
+            for n, i in enumerate(pending, 1)
+        )
+        
+        prompt = f"""Resume cada una de las siguientes noticias en máximo {max_lines} líneas.
+        Mantén solo los hechos más importantes, sin opiniones.
+        
+        {articles_block}
+        
+        Devuelve exactamente {len(pending)} resúmenes numerados del 1 al {len(pending)}, en el mismo orden, uno por línea.
+        
+        Resúmenes:"""
+        
+        response = self._call_llm(prompt, max_tokens=200 * len(pending))
+        parts = None
+        if response == self._mock_response(prompt):
+            # The batch call failed (e.g. timeout): summarize one by one
+            logger.warning(f"Batch summary failed for {len(pending)} articles, retrying individually")
+        else:
+            parts = [part.strip() for part in re.split(r'^\s*\d+[\.\)]\s*', response, flags=re.M)[1:]]
+            if len(parts) != len(pending):
+                # The model did not follow the numbered format: summarize one by one
+                logger.warning(f"Batch summary returned {len(parts)} items for {len(pending)} articles, retrying individually")
+                parts = None
+        
+        if parts is None:
+            return [
+                summary if summary is not None else self.generate_article_summary(article, max_lines)
+                for article, summary in zip(articles, summaries)
+            ]
+        
+        for i, summary in zip(pending, parts):
+            summaries[i] = summary
+            self._cache_set(self._article_cache_key(articles[i], max_lines), summary, prompt, response)
+        
+        return summaries
+    
+    def _article_cache_key(self, article: Article, max_lines: int) -> str:
+        """Cache key shared by single and batched article summaries"""
+        return LLMCache.make_key(
+            'article', self.provider, self.model, max_lines,
+            article.url, article.title, article.subtitle, article.content
+        )
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached LLM response"""
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+    
+    def _cache_set(self, key: str, value: str, prompt: str, response: str):
+        """Store a response, skipping mock fallbacks so failures are retried next run"""
+        if self.cache is None or response == self._mock_response(prompt):
+            return
+        self.cache.set(key, value)
     
     def _prepare_editorial_context(
         self,
@@ -167,7 +285,12 @@ class LLMProcessor:
                     }
                 }
                 
-                response = requests.post(self.ollama_url, json=payload, timeout=60)
+                response = requests.post(
+                    self.ollama_url,
+                    data=_dumps(payload),
+                    headers={'Content-Type': 'application/json'},
+                    timeout=self._request_timeout(max_tokens)
+                )
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -205,6 +328,11 @@ class LLMProcessor:
             logger.error(f"Error calling LLM: {e}")
             return self._mock_response(prompt)
     
+    @staticmethod
+    def _request_timeout(max_tokens: int) -> float:
+        """Timeout for a local LLM request, scaled with the number of tokens it may generate"""
+        return settings.LLM_TIMEOUT_SECONDS + max_tokens * settings.LLM_TIMEOUT_PER_TOKEN_SECONDS
+    
     def _validate_editorial(self, editorial: str) -> str:
         """Validate and fix editorial summary"""
         lines = editorial.strip().split('\n')
@@ -265,6 +393,11 @@ Finalmente, el gobierno anunció avances en la reforma de pensiones que incluir
         
         return len(issues) == 0, issues
 
+@lru_cache(maxsize=1)
+def get_llm_processor() -> LLMProcessor:
+    """Shared LLMProcessor, built once per process"""
+    return LLMProcessor()
+
 class FactChecker:
     """Basic fact checking and validation"""
     
@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 
 from config import settings
 from models import init_db, Article, Newsletter, NewsSource, LogEntry
-from scraper import NewsScraper, BancoCentralScraper, DuplicateDetector
+from scraper import NewsScraper, BancoCentralScraper, DuplicateDetector, close_shared_client
 from classifier import NewsClassifier, NewsSection, ClassificationResult
 from llm_processor import LLMProcessor
 from mailchimp_integration import MailchimpManager, NewsletterComposer
@@ -278,7 +278,10 @@ async def main():
     agent = ClippingAgent()
     
     # Run daily clipping
-    newsletter = await agent.run_daily_clipping()
+    try:
+        newsletter = await agent.run_daily_clipping()
+    finally:
+        await close_shared_client()
     
     logger.info(f"Newsletter created with status: {newsletter.status}")
     
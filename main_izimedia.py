@@ -14,7 +14,7 @@ from models import Article
 from classifier import NewsClassifier, NewsSection
 from llm_processor import LLMProcessor
 from newsletter_composer import NewsletterComposer
-from scraper import BancoCentralScraper
+from scraper import BancoCentralScraper, close_shared_client
 from izimedia_connector import IziMediaConnector, IziMediaValidator, IziMediaArticle
 
 # Configurar logging
@@ -134,12 +134,6 @@ class ACAFIClippingAgent:
             logger.info("\n📋 PASO 5: COMPOSICIÓN DEL NEWSLETTER")
             logger.info("-"*50)
             
-            html_content, text_content = self.composer.compose_newsletter(
-                editorial,
-                indicators,
-                articles_with_summaries
-            )
-            
             # Agregar nota de fuente IziMedia
             footer_note = """
             <div style="margin-top: 20px; padding: 15px; background: #f0f0f0; font-size: 10pt;">
@@ -148,7 +142,12 @@ class ACAFIClippingAgent:
                 <p>Fecha de consulta: """ + datetime.now().strftime("%d/%m/%Y %H:%M") + """</p>
             </div>
             """
-            html_content = html_content.replace('</body>', f'{footer_note}</body>')
+            html_content, text_content = self.composer.compose_newsletter(
+                editorial,
+                indicators,
+                articles_with_summaries,
+                footer_html=footer_note
+            )
             
             # ========================================
             # PASO 6: GUARDAR Y PREPARAR ENVÍO
@@ -306,7 +305,11 @@ async def main():
     """)
     
     agent = ACAFIClippingAgent()
-    success = await agent.run_daily_monitoring()
+    try:
+        success = await agent.run_daily_monitoring()
+    finally:
+        # Cerrar las conexiones keep-alive antes de que termine el event loop
+        await close_shared_client()
     
     if success:
         print("\n✅ Proceso completado exitosamente")
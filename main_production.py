@@ -15,7 +15,7 @@ from classifier import NewsClassifier, NewsSection
 from llm_processor import LLMProcessor
 from newsletter_composer import NewsletterComposer
 from news_sources import RealNewsConnector, CitationManager, NewsValidator, NewsItem
-from scraper import BancoCentralScraper
+from scraper import BancoCentralScraper, close_shared_client
 
 # Configurar logging
 logger.add(
@@ -104,15 +104,14 @@ class ProductionClippingAgent:
             
             # PASO 8: Componer newsletter
             logger.info("\n📧 PASO 8: Componiendo newsletter final...")
+            # Agregar sección de fuentes al final
+            sources_section = self._create_sources_section(news_items)
             html_content, text_content = self.composer.compose_newsletter(
                 editorial,
                 indicators,
-                articles_with_summaries
+                articles_with_summaries,
+                footer_html=sources_section
             )
-            
-            # Agregar sección de fuentes al final
-            sources_section = self._create_sources_section(news_items)
-            html_content = html_content.replace('</body>', f'{sources_section}</body>')
             text_content += f"\n\n{sources_section}"
             
             # PASO 9: Guardar newsletter
@@ -269,7 +268,11 @@ async def main():
     """Función principal de producción"""
     agent = ProductionClippingAgent()
     
-    success = await agent.run_daily_newsletter()
+    try:
+        success = await agent.run_daily_newsletter()
+    finally:
+        # Cerrar las conexiones keep-alive antes de que termine el event loop
+        await close_shared_client()
     
     if success:
         logger.info("\n" + "="*60)
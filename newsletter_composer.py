@@ -2,7 +2,8 @@
 Compositor de newsletter HTML sin dependencias de Mailchimp
 """
 from datetime import datetime
-from typing import List, Dict, Tuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
 from models import Article
 from classifier import NewsSection
 
@@ -177,7 +178,7 @@ class NewsletterComposer:
             <p><a href="https://www.acafi.cl">www.acafi.cl</a></p>
         </div>
     </div>
-</body>
+{footer_html}</body>
 </html>
 """
     
@@ -185,15 +186,13 @@ class NewsletterComposer:
         self,
         editorial_summary: str,
         indicators: Dict[str, str],
-        articles_by_section: Dict[NewsSection, List[Tuple[Article, str]]]
+        articles_by_section: Dict[NewsSection, List[Tuple[Article, str]]],
+        footer_html: str = ""
     ) -> Tuple[str, str]:
-        """Compose HTML and text versions of newsletter"""
-        
-        # Format date in Spanish
-        months = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
-                  'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
-        now = datetime.now()
-        date_str = f"{now.day} de {months[now.month-1]} de {now.year}"
+        """Compose HTML and text versions of newsletter
+
+        footer_html is inserted right before </body> (e.g. a sources section).
+        """
         
         # Format indicators
         indicators_html = self._format_indicators_html(indicators)
@@ -203,10 +202,11 @@ class NewsletterComposer:
         
         # Compose HTML
         html_content = self.template.format(
-            date=date_str,
+            date=self._format_date(),
             editorial_summary=editorial_summary.replace('\n', '<br>'),
             indicators=indicators_html,
-            sections=sections_html
+            sections=sections_html,
+            footer_html=footer_html
         )
         
         # Create text version
@@ -218,6 +218,51 @@ class NewsletterComposer:
         
         return html_content, text_content
     
+    def write_newsletter_html(
+        self,
+        editorial_summary: str,
+        indicators: Dict[str, str],
+        articles_by_section: Dict[NewsSection, List[Tuple[Article, str]]],
+        path: Path,
+        footer_html: str = ""
+    ):
+        """Write the HTML version to `path` section by section
+
+        Same output as compose_newsletter, without holding the whole HTML document in memory.
+        """
+        head, tail = self.template.split('{sections}')
+        with open(path, 'w', encoding='utf-8', buffering=1 << 20) as out:
+            out.write(head.format(
+                date=self._format_date(),
+                editorial_summary=editorial_summary.replace('\n', '<br>'),
+                indicators=self._format_indicators_html(indicators)
+            ))
+            for i, section_html in enumerate(self._iter_sections_html(articles_by_section)):
+                if i:
+                    out.write('\n')
+                out.write(section_html)
+            out.write(tail.format(footer_html=footer_html))
+    
+    def write_newsletter_text(
+        self,
+        editorial_summary: str,
+        indicators: Dict[str, str],
+        articles_by_section: Dict[NewsSection, List[Tuple[Article, str]]],
+        path: Path
+    ):
+        """Write the plain text version to `path`"""
+        path.write_text(
+            self._create_text_version(editorial_summary, indicators, articles_by_section),
+            encoding='utf-8'
+        )
+    
+    def _format_date(self) -> str:
+        """Format today's date in Spanish"""
+        months = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+                  'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+        now = datetime.now()
+        return f"{now.day} de {months[now.month-1]} de {now.year}"
+    
     def _format_indicators_html(self, indicators: Dict[str, str]) -> str:
         """Format economic indicators for HTML"""
         items = []
@@ -232,8 +277,10 @@ class NewsletterComposer:
     
     def _format_sections_html(self, articles_by_section: Dict[NewsSection, List[Tuple[Article, str]]]) -> str:
         """Format article sections for HTML"""
-        sections_html = []
-        
+        return '\n'.join(self._iter_sections_html(articles_by_section))
+    
+    def _iter_sections_html(self, articles_by_section: Dict[NewsSection, List[Tuple[Article, str]]]) -> Iterator[str]:
+        """Yield the HTML block of each non-empty section"""
         for section, articles_with_summaries in articles_by_section.items():
             # Skip empty sections or ACAFI section if no articles
             if not articles_with_summaries:
@@ -258,9 +305,7 @@ class NewsletterComposer:
                 '''
             
             section_html += '</div>'
-            sections_html.append(section_html)
-        
-        return '\n'.join(sections_html)
+            yield section_html
     
     def _create_text_version(
         self,
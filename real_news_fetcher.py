@@ -2,10 +2,12 @@
 """
 Obtenedor de noticias reales de fuentes RSS chilenas
 """
+import asyncio
 import feedparser
+import httpx
 import requests
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 import re
 from models import Article
 from loguru import logger
@@ -13,7 +15,15 @@ from loguru import logger
 class RealNewsFetcher:
     """Obtener noticias REALES de fuentes RSS chilenas"""
     
-    def __init__(self):
+    # Headers para evitar bloqueos de algunos feeds
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    }
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Cliente HTTP compartido (opcional) para fetch_all_news_async
+        self.client = client
+        
         # Fuentes RSS que funcionan actualmente
         self.rss_sources = [
             {
@@ -91,19 +101,61 @@ class RealNewsFetcher:
         
         return relevant_articles
     
+    async def fetch_all_news_async(self, days_back: int = 2) -> List[Article]:
+        """Obtener noticias de todas las fuentes RSS en paralelo"""
+        all_articles = []
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        
+        logger.info("📡 Obteniendo noticias reales de fuentes RSS...")
+        
+        if self.client is not None:
+            responses = await self._download_feeds(self.client)
+        else:
+            async with httpx.AsyncClient() as client:
+                responses = await self._download_feeds(client)
+        
+        for source, response in zip(self.rss_sources, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"     ⚠️ Error en {source['name']}: {str(response)[:50]}")
+                continue
+            articles = self._parse_feed(source, response.content, cutoff_date)
+            all_articles.extend(articles)
+            logger.info(f"  🔍 {source['name']}: {len(articles)} noticias obtenidas")
+        
+        # Filtrar por relevancia
+        relevant_articles = self._filter_relevant(all_articles)
+        
+        logger.info(f"\n📊 Total: {len(relevant_articles)} noticias relevantes de {len(all_articles)} totales")
+        
+        return relevant_articles
+    
+    async def _download_feeds(self, client: httpx.AsyncClient) -> list:
+        """Descargar todos los feeds concurrentemente reutilizando las conexiones del cliente"""
+        return await asyncio.gather(
+            *(
+                client.get(source['url'], headers=self.HEADERS, timeout=10, follow_redirects=True)
+                for source in self.rss_sources
+            ),
+            return_exceptions=True
+        )
+    
     def _fetch_from_rss(self, source: dict, cutoff_date: datetime) -> List[Article]:
         """Obtener noticias de un feed RSS específico"""
+        try:
+            # Algunos feeds requieren headers específicos
+            response = requests.get(source['url'], headers=self.HEADERS, timeout=10)
+        except Exception as e:
+            logger.error(f"Error obteniendo RSS de {source['name']}: {e}")
+            return []
+        
+        return self._parse_feed(source, response.content, cutoff_date)
+    
+    def _parse_feed(self, source: dict, content: bytes, cutoff_date: datetime) -> List[Article]:
+        """Convertir el contenido de un feed RSS en artículos"""
         articles = []
         
         try:
-            # Configurar headers para evitar bloqueos
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            
-            # Algunos feeds requieren headers específicos
-            response = requests.get(source['url'], headers=headers, timeout=10)
-            feed = feedparser.parse(response.content)
+            feed = feedparser.parse(content)
             
             for entry in feed.entries[:20]:  # Máximo 20 por fuente
                 try:
@@ -149,7 +201,7 @@ class RealNewsFetcher:
                     continue
                     
         except Exception as e:
-            logger.error(f"Error obteniendo RSS de {source['name']}: {e}")
+            logger.error(f"Error procesando RSS de {source['name']}: {e}")
         
         return articles
     
@@ -1,6 +1,8 @@
 import asyncio
 import hashlib
 import json
+import os
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 from urllib.parse import urlparse, urljoin
@@ -133,27 +135,85 @@ class NewsScraper:
         logger.info(f"Scraped {len(articles)} articles from {source.name}")
         return articles
 
+# One pooled client per event loop (an AsyncClient cannot be shared across loops).
+# Entry points release theirs with close_shared_client() before the loop ends.
+_shared_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Return the keep-alive AsyncClient of the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+        _shared_clients[loop] = client
+    return client
+
+async def close_shared_client():
+    """Close the running event loop's shared client, if any, and forget it"""
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
 class BancoCentralScraper:
     """Special scraper for Banco Central indicators"""
     
     INDICATORS_URL = "https://si3.bcentral.cl/indicadoressiete/secure/indicadoresdiarios.aspx"
+    CACHE_FILE = settings.DATA_DIR / "indicators_cache.json"
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # Shared client (optional) so connections are reused across scrapers
+        self.client = client
+    
+    async def fetch_indicators_cached(self) -> Dict[str, str]:
+        """Return today's indicators from the on-disk cache, fetching them on a miss or after the TTL"""
+        if not settings.ENABLE_CACHE:
+            return await self.fetch_indicators()
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        try:
+            entry = json.loads(self.CACHE_FILE.read_text(encoding='utf-8'))
+            if (entry['date'] == today
+                    and time.time() - entry['fetched_at'] < settings.INDICATORS_CACHE_TTL_SECONDS
+                    and isinstance(entry['indicators'], dict)):
+                return entry['indicators']
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass  # Missing, corrupt or differently shaped cache: fetch again
+        
+        indicators = await self.fetch_indicators()
+        # Fallback values ('N/A') are not cached so the next run retries
+        if 'N/A' not in indicators.values():
+            payload = json.dumps({'date': today, 'fetched_at': time.time(), 'indicators': indicators}, ensure_ascii=False)
+            # Write to a temp file and swap it in so concurrent runs never read a partial cache
+            tmp_file = self.CACHE_FILE.with_name(f"{self.CACHE_FILE.name}.{os.getpid()}.tmp")
+            try:
+                tmp_file.write_text(payload, encoding='utf-8')
+                os.replace(tmp_file, self.CACHE_FILE)
+            except OSError as e:
+                logger.debug(f"Could not write indicators cache: {e}")
+        return indicators
+    
+    async def _get(self, url: str) -> httpx.Response:
+        client = self.client if self.client is not None else get_shared_client()
+        return await client.get(url)
     
     async def fetch_indicators(self) -> Dict[str, str]:
         indicators = {}
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.INDICATORS_URL)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Parse indicators (this would need to be adjusted based on actual HTML structure)
-                # This is a placeholder implementation
-                indicators = {
-                    'UF': '$39.360,32',
-                    'Dólar Observado': '$967,48',
-                    'Euro': '$1.130,63',
-                    'UTM': '$68.647,00'
-                }
-                
+            response = await self._get(self.INDICATORS_URL)
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            # Parse indicators (this would need to be adjusted based on actual HTML structure)
+            # This is a placeholder implementation
+            indicators = {
+                'UF': '$39.360,32',
+                'Dólar Observado': '$967,48',
+                'Euro': '$1.130,63',
+                'UTM': '$68.647,00'
+            }
+            
         except Exception as e:
             logger.error(f"Error fetching Banco Central indicators: {e}")
             # Return default values as fallback
@@ -207,7 +267,8 @@ class DuplicateDetector:
             if i in processed:
                 continue
                 
-            group_id = str(article.id)
+            # Articles that are not persisted yet have no id
+            group_id = str(article.id) if article.id is not None else str(i)
             groups[group_id] = [article]
             processed.add(i)
             
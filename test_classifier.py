@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Pruebas del clasificador: autómata de palabras clave, caché de reglas y memo de classify()
+"""
+import random
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import classifier
+from classifier import NewsClassifier
+from config import settings
+from models import Article
+
+KEYWORD_ROWS = [
+    ("Indicadores", "Macro", "IPC|dólar|tasa de política monetaria", "Todos"),
+    ("ACAFI", "Gremio", "ACAFI|asociación de fondos", "Todos"),
+    ("Temas Industria", "Fondos", 'fondo de inversión|"venture capital"|AGF', "DF"),
+    ("Temas Industria", "Inmobiliario", "multifamily|renta residencial|fondo", "Todos"),
+    ("Temas Industria", "Mercados", "S&P 500|IPSA (Chile)|U.S.", "Todos"),
+    ("Noticias de Interés", "Energía", "litio|hidrógeno verde|Codelco", "Todos"),
+]
+
+FILLER = ["el", "mercado", "chileno", "anunció", "hoy", "nuevo", "capital", "inversión", "de", "la", "tasa"]
+
+@pytest.fixture
+def keywords_file(tmp_path, monkeypatch):
+    """Planilla de palabras clave mínima y una caché de reglas aislada en tmp_path"""
+    monkeypatch.setattr(classifier, "KEYWORDS_CACHE_DIR", tmp_path / "keywords_cache")
+
+    # El clasificador salta las 2 primeras filas de datos (títulos de la planilla)
+    rows = [("Título", "", "", ""), ("Sección", "Tema", "Palabras", "Medio")] + KEYWORD_ROWS
+    path = tmp_path / "Palabras_Claves.xlsx"
+    pd.DataFrame(rows, columns=["A", "B", "C", "D"]).to_excel(path, sheet_name=settings.CLIENT_NAME, index=False)
+    return path
+
+def _random_texts(count: int, seed: int = 7) -> list[str]:
+    """Textos que mezclan palabras clave (con mayúsculas variadas) y relleno"""
+    rng = random.Random(seed)
+    keywords = [k.strip('"') for row in KEYWORD_ROWS for k in row[2].split('|')]
+    texts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(3, 12))
+        for _ in range(rng.randint(0, 3)):
+            keyword = rng.choice(keywords)
+            keyword = rng.choice([keyword, keyword.upper(), keyword.lower()])
+            words.insert(rng.randint(0, len(words)), keyword)
+        texts.append(" ".join(words))
+    return texts
+
+def _regex_only(keywords_file, monkeypatch) -> NewsClassifier:
+    """Clasificador que revisa cada regla con pattern.search, sin autómata ni prefiltro"""
+    monkeypatch.setattr(classifier, "ahocorasick", None)
+    reference = NewsClassifier(keywords_file=keywords_file)
+    reference.keyword_prefilter = None
+    return reference
+
+def test_automaton_matches_regex_rules(keywords_file, monkeypatch):
+    pytest.importorskip("ahocorasick")
+    fast = NewsClassifier(keywords_file=keywords_file)
+    assert fast.keyword_automaton is not None
+    reference = _regex_only(keywords_file, monkeypatch)
+
+    for text in _random_texts(2000):
+        expected = reference._classify_text(text)
+        result = fast._classify_text(text)
+        assert result.section == expected.section, text
+        assert result.confidence == expected.confidence, text
+        assert sorted(result.matched_keywords) == sorted(expected.matched_keywords), text
+        assert sorted(result.sector_tags) == sorted(expected.sector_tags), text
+
+def test_prefilter_matches_regex_rules(keywords_file, monkeypatch):
+    monkeypatch.setattr(classifier, "ahocorasick", None)
+    prefiltered = NewsClassifier(keywords_file=keywords_file)
+    assert prefiltered.keyword_prefilter is not None
+    reference = _regex_only(keywords_file, monkeypatch)
+
+    for text in _random_texts(1000, seed=11):
+        expected = reference._classify_text(text)
+        result = prefiltered._classify_text(text)
+        assert (result.section, sorted(result.matched_keywords)) == (expected.section, sorted(expected.matched_keywords)), text
+
+def test_cached_rules_match_cold_load(keywords_file, monkeypatch):
+    cold = NewsClassifier(keywords_file=keywords_file)
+    assert list(classifier.KEYWORDS_CACHE_DIR.glob("*.pkl"))
+
+    # Con la caché escrita, una segunda carga no debe volver a leer el Excel
+    def fail_read_excel(*args, **kwargs):
+        raise AssertionError("read_excel called despite a cached workbook")
+    monkeypatch.setattr(classifier.pd, "read_excel", fail_read_excel)
+
+    warm = NewsClassifier(keywords_file=keywords_file)
+    assert warm.keyword_rules == cold.keyword_rules
+    assert warm.rule_table == cold.rule_table
+
+def test_corrupt_cache_falls_back_to_workbook(keywords_file):
+    cold = NewsClassifier(keywords_file=keywords_file)
+    for cache_file in classifier.KEYWORDS_CACHE_DIR.glob("*.pkl"):
+        cache_file.write_bytes(b"not a pickle")
+
+    assert NewsClassifier(keywords_file=keywords_file).keyword_rules == cold.keyword_rules
+
+def test_classify_returns_independent_lists_on_memo_hits(keywords_file):
+    news_classifier = NewsClassifier(keywords_file=keywords_file)
+    article = Article(
+        url="https://df.cl/test",
+        source="Diario Financiero",
+        title="ACAFI destaca nuevo fondo de inversión en litio",
+        subtitle=None,
+        content="La AGF levantó capital para multifamily.",
+        published_at=datetime.now()
+    )
+
+    first = news_classifier.classify(article)
+    assert first.mentions_acafi and first.sector_tags
+    first.matched_keywords.append("mutado")
+    first.sector_tags.clear()
+
+    second = news_classifier.classify(article)
+    assert news_classifier._classify_text.cache_info().hits == 1
+    assert "mutado" not in second.matched_keywords
+    assert second.sector_tags
+    assert second.matched_keywords is not first.matched_keywords
@@ -3,6 +3,10 @@
 Script de prueba para el sistema de verificación de hechos y prevención de alucinaciones
 """
 from datetime import datetime, timedelta
+from itertools import islice
+
+import numpy as np
+
 from models import Article
 from fact_checker import FactChecker, HallucinationPreventer
 from llm_processor import LLMProcessor
@@ -19,6 +23,7 @@ def test_fact_checking():
     preventer = HallucinationPreventer()
     
     # Crear artículos de prueba
+    now = datetime.now()
     real_articles = [
         Article(
             url="https://df.cl/test1",
@@ -26,7 +31,7 @@ def test_fact_checking():
             title="ACAFI presenta propuesta regulatoria a la CMF",
             subtitle="Buscan mayor flexibilidad para inversiones",
             content="La Asociación Chilena de Administradoras de Fondos de Inversión (ACAFI) presentó una propuesta a la CMF para flexibilizar las inversiones alternativas. La medida beneficiaría a 45 AGF.",
-            published_at=datetime.now()
+            published_at=now
         ),
         Article(
             url="https://elmercurio.com/test2",
@@ -34,7 +39,7 @@ def test_fact_checking():
             title="Banco Central mantiene tasa en 5,5%",
             subtitle="Decisión unánime del consejo",
             content="El Banco Central de Chile mantuvo la tasa de política monetaria en 5,5%. El consejo votó de forma unánime citando presiones inflacionarias.",
-            published_at=datetime.now() - timedelta(days=1)
+            published_at=now - timedelta(days=1)
         )
     ]
     
@@ -117,8 +122,7 @@ El mercado espera una respuesta en las próximas semanas sobre estas medidas."""
     print("Prompt original:")
     print(f"  {original_prompt}")
     print("\nPrompt mejorado (extracto):")
-    lines = enhanced_prompt.split('\n')[:10]
-    for line in lines:
+    for line in islice(enhanced_prompt.splitlines(), 10):
         if line.strip():
             print(f"  {line}")
     
@@ -176,5 +180,92 @@ El mercado espera una respuesta en las próximas semanas sobre estas medidas."""
     print("• Los prompts mejorados reducen las alucinaciones")
     print("• La verificación integrada asegura la calidad del contenido")
 
+class StubEmbedder:
+    """Embedder de prueba: vectores fijos por texto, [0, 0, 1] para el resto"""
+    
+    def __init__(self, vectors):
+        self.vectors = vectors
+    
+    def encode(self, texts, **kwargs):
+        return np.array([self.vectors.get(text, [0.0, 0.0, 1.0]) for text in texts], dtype=np.float32)
+
+def _source_articles():
+    now = datetime.now()
+    return [
+        Article(url="https://df.cl/a", source="Diario Financiero", title="ACAFI presenta propuesta",
+                subtitle=None, content="La CMF evalúa fondos", published_at=now),
+        Article(url="https://df.cl/b", source="El Mercurio", title="Banco Central mantiene tasa",
+                subtitle=None, content="Decisión unánime", published_at=now),
+    ]
+
+SOURCE_VECTORS = {
+    "ACAFI presenta propuesta  La CMF evalúa fondos": [3.0, 0.0, 0.0],  # se normaliza al indexar
+    "Banco Central mantiene tasa  Decisión unánime": [0.0, 1.0, 0.0],
+}
+
+def test_build_source_index_normalizes_rows():
+    articles = _source_articles()
+    assert FactChecker()._build_source_index(articles) is None
+    
+    index = FactChecker(embedder=StubEmbedder(SOURCE_VECTORS))._build_source_index(articles)
+    assert index.articles == articles
+    assert index.emb.dtype == np.float32 and index.emb.flags['C_CONTIGUOUS']
+    np.testing.assert_allclose(index.emb, [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+def test_match_sources_applies_support_threshold():
+    articles = _source_articles()
+    vectors = dict(SOURCE_VECTORS, **{
+        "casi igual a ACAFI": [0.95, 0.05, 0.0],
+        "a medio camino": [1.0, 1.0, 0.0],  # coseno 0.71 con ambas fuentes
+    })
+    checker = FactChecker(embedder=StubEmbedder(vectors))
+    index = checker._build_source_index(articles)
+    
+    matches = checker._match_sources(["casi igual a ACAFI", "a medio camino", "sin relación"], index)
+    
+    article, score = matches[0]
+    assert article is articles[0] and score >= FactChecker.SUPPORT_THRESHOLD
+    assert matches[1:] == [None, None]
+    assert checker._match_sources([], index) == []
+
+def test_editorial_overlap_bands():
+    articles = _source_articles()
+    supported = "ACAFI presenta propuesta"              # solapamiento 100%
+    unsupported = "Ventas récord en supermercados"     # solapamiento 0%
+    backed = "ACAFI presenta algo distinto"           # 50%, respaldada por embeddings
+    unbacked = "La CMF revisa otra cosa rara"          # 33%, sin fuente similar
+    vectors = dict(SOURCE_VECTORS, **{backed: [1.0, 0.0, 0.0]})
+    editorial = ". ".join([supported, unsupported, backed, unbacked])
+    
+    result = FactChecker(embedder=StubEmbedder(vectors)).verify_editorial_summary(editorial, articles)
+    
+    assert result.evidence[supported].startswith("Solapamiento con fuentes")
+    assert any(issue.startswith("Oración sin respaldo") and unsupported in issue for issue in result.issues)
+    assert result.evidence[backed].startswith("Diario Financiero: ACAFI presenta propuesta")
+    assert any(issue.startswith("Oración sin fuente que la respalde") and unbacked in issue for issue in result.issues)
+    assert not any(backed in issue for issue in result.issues)
+    assert not result.is_valid
+    
+    # Sin embedder las oraciones ambiguas no se juzgan
+    plain = FactChecker().verify_editorial_summary(editorial, articles)
+    assert not any(issue.startswith("Oración sin fuente que la respalde") for issue in plain.issues)
+    assert backed not in plain.evidence
+
+def test_embedder_loader_runs_only_for_ambiguous_sentences():
+    articles = _source_articles()
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        return StubEmbedder(SOURCE_VECTORS)
+    
+    checker = FactChecker(embedder_loader=loader)
+    checker.verify_editorial_summary("ACAFI presenta propuesta", articles)
+    assert calls == []
+    
+    checker.verify_editorial_summary("ACAFI presenta algo distinto. La CMF revisa otra cosa rara", articles)
+    checker.verify_editorial_summary("ACAFI presenta algo distinto", articles)
+    assert calls == [1]
+
 if __name__ == "__main__":
     test_fact_checking()
\ No newline at end of file
@@ -6,6 +6,11 @@ import asyncio
 from datetime import datetime
 from izimedia_connector import IziMediaConnector, IziMediaValidator
 
+try:
+    import uvloop  # Event loop basado en libuv (opcional, no disponible en Windows)
+except ImportError:
+    uvloop = None
+
 async def test_izimedia_connection():
     """Probar la conexión y funcionalidad de IziMedia"""
     
@@ -49,8 +54,7 @@ async def test_izimedia_connection():
         # Mostrar palabras clave
         print(f"\n🔍 Reglas de palabras clave: {len(connector.keyword_rules)}")
         print("   Primeras 5:")
-        for i, rule in enumerate(connector.keyword_rules[:5], 1):
-            query = connector._build_search_query(rule)
+        for i, (rule, query) in enumerate(connector.search_queries[:5], 1):
             print(f"   {i}. {rule.section} | {rule.theme} -> {query}")
         
         # Intentar obtener noticias
@@ -95,22 +99,23 @@ async def test_izimedia_connection():
         from models import Article
         from datetime import timedelta
         
+        now = datetime.now()
         test_articles = [
             Article(
                 url="https://df.cl/test",
                 source="Diario Financiero (simulado)",
                 title="ACAFI propone nuevas regulaciones para el sector",
                 content="Contenido de prueba...",
-                published_at=datetime.now(),
-                scraped_at=datetime.now()
+                published_at=now,
+                scraped_at=now
             ),
             Article(
                 url="https://elmercurio.com/test",
                 source="El Mercurio (simulado)",
                 title="Fondos de inversión muestran crecimiento",
                 content="Contenido de prueba...",
-                published_at=datetime.now() - timedelta(days=1),
-                scraped_at=datetime.now()
+                published_at=now - timedelta(days=1),
+                scraped_at=now
             )
         ]
         
@@ -139,4 +144,7 @@ async def main():
     print("="*70 + "\n")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
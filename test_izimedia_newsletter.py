@@ -4,21 +4,46 @@ Script para generar newsletter REAL con datos de IziMedia
 Integra el conector de IziMedia con el sistema de newsletter
 """
 import asyncio
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 import webbrowser
 
 from loguru import logger
+from config import settings
 from izimedia_real import IziMediaRealConnector
 from classifier import NewsClassifier, NewsSection
 from llm_processor import LLMProcessor
 from newsletter_composer import NewsletterComposer
-from scraper import BancoCentralScraper
+from scraper import BancoCentralScraper, close_shared_client
+from fact_checker import FactChecker
 from models import Article
 
+try:
+    import uvloop  # Event loop basado en libuv (opcional, no disponible en Windows)
+except ImportError:
+    uvloop = None
+
 # Configurar logging
 logger.add("logs/izimedia_newsletter_{time}.log", rotation="1 day", level="INFO")
 
+@lru_cache(maxsize=1)
+def load_embedder():
+    """Cargar el modelo de embeddings una sola vez (None si no está instalado o no se pudo cargar)"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers no instalado, verificación semántica desactivada")
+        return None
+    
+    try:
+        return SentenceTransformer(settings.EMBEDDING_MODEL, device='cpu')
+    except Exception as e:
+        # Descarga fallida (sin red, caída de Hugging Face, proxy): el newsletter no depende del modelo
+        logger.warning(f"No se pudo cargar el modelo de embeddings ({e}), verificación semántica desactivada")
+        return None
+
 class IziMediaNewsletterGenerator:
     """Generador de newsletter usando IziMedia como fuente"""
     
@@ -26,6 +51,8 @@ class IziMediaNewsletterGenerator:
         self.izimedia = IziMediaRealConnector()
         self.classifier = NewsClassifier()
         self.llm_processor = LLMProcessor()
+        # El modelo de embeddings (opcional) se carga solo si el editorial tiene oraciones ambiguas
+        self.fact_checker = FactChecker(embedder_loader=load_embedder)
         self.bc_scraper = BancoCentralScraper()
         self.composer = NewsletterComposer()
         self.output_dir = Path("output")
@@ -37,6 +64,9 @@ class IziMediaNewsletterGenerator:
         logger.info("📰 GENERACIÓN DE NEWSLETTER ACAFI - IZIMEDIA")
         logger.info("="*60)
         
+        # Los indicadores no dependen de las noticias: se obtienen en paralelo
+        indicators_task = asyncio.create_task(self.bc_scraper.fetch_indicators())
+        
         try:
             # PASO 1: Obtener noticias de IziMedia
             logger.info("\n📥 PASO 1: Obteniendo noticias de IziMedia...")
@@ -52,22 +82,18 @@ class IziMediaNewsletterGenerator:
             logger.info("\n🔄 PASO 2: Convirtiendo formato para clasificación...")
             articles = self._convert_to_articles(izimedia_news)
             
-            # PASO 3: Clasificar noticias
-            logger.info("\n📊 PASO 3: Clasificando noticias por sección...")
-            classified = self._classify_articles(articles)
+            # PASO 3-4: Clasificar y generar resúmenes en una sola pasada
+            logger.info("\n📊 PASO 3-4: Clasificando noticias y generando resúmenes con Ollama...")
+            classified, articles_with_summaries = await self._classify_and_dispatch(articles)
             
             for section, items in classified.items():
                 if items:
                     logger.info(f"   • {section.value}: {len(items)} noticias")
-            
-            # PASO 4: Generar resúmenes con LLM
-            logger.info("\n✍️ PASO 4: Generando resúmenes con Ollama...")
-            articles_with_summaries = await self._generate_summaries(classified, izimedia_news)
             logger.info("   ✅ Resúmenes generados")
             
             # PASO 5: Obtener indicadores económicos
             logger.info("\n💹 PASO 5: Obteniendo indicadores económicos...")
-            indicators = await self.bc_scraper.fetch_indicators()
+            indicators = await indicators_task
             logger.info(f"   ✅ Indicadores obtenidos")
             
             # PASO 6: Generar resumen editorial
@@ -75,6 +101,12 @@ class IziMediaNewsletterGenerator:
             editorial = self._generate_editorial(classified, izimedia_news)
             logger.info("   ✅ Resumen editorial generado")
             
+            check = self.fact_checker.verify_editorial_summary(editorial, articles)
+            if not check.is_valid:
+                logger.warning(f"   ⚠️ Verificación editorial: confianza {check.confidence:.0%}")
+                for issue in check.issues:
+                    logger.warning(f"      • {issue}")
+            
             # Mostrar el editorial
             logger.info("\n" + "-"*40)
             logger.info("RESUMEN EDITORIAL:")
@@ -83,16 +115,15 @@ class IziMediaNewsletterGenerator:
             
             # PASO 7: Componer newsletter
             logger.info("\n📧 PASO 7: Componiendo newsletter HTML...")
+            # Agregar sección de fuentes de IziMedia
+            sources_html = self._create_izimedia_sources_section(izimedia_news)
             html_content, text_content = self.composer.compose_newsletter(
                 editorial,
                 indicators,
-                articles_with_summaries
+                articles_with_summaries,
+                footer_html=sources_html
             )
             
-            # Agregar sección de fuentes de IziMedia
-            sources_html = self._create_izimedia_sources_section(izimedia_news)
-            html_content = html_content.replace('</body>', f'{sources_html}</body>')
-            
             # PASO 8: Guardar archivos
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             html_file = self.output_dir / f"newsletter_izimedia_{timestamp}.html"
@@ -119,10 +150,15 @@ class IziMediaNewsletterGenerator:
             import traceback
             traceback.print_exc()
             return False
+        
+        finally:
+            if not indicators_task.done():
+                indicators_task.cancel()
     
     def _convert_to_articles(self, izimedia_news):
         """Convertir noticias de IziMedia a formato Article"""
         articles = []
+        now = datetime.now()
         for news in izimedia_news:
             article = Article(
                 url=news.url_izimedia,  # Usar URL de IziMedia
@@ -132,64 +168,47 @@ class IziMediaNewsletterGenerator:
                 content=news.snippet,
                 author=None,
                 published_at=news.date,
-                scraped_at=datetime.now()
+                scraped_at=now
             )
             articles.append(article)
         return articles
     
-    def _classify_articles(self, articles):
-        """Clasificar artículos por sección"""
-        classified = {
-            NewsSection.INDICADORES: [],
-            NewsSection.ACAFI: [],
-            NewsSection.INDUSTRIA: [],
-            NewsSection.INTERES: [],
-            NewsSection.SOCIOS: []
-        }
+    async def _classify_and_dispatch(self, articles):
+        """Clasificar artículos y resumir los 5 prioritarios de cada sección"""
+        classified = {section: [] for section in NewsSection}
         
-        for article in articles:
-            result = self.classifier.classify(article)
+        results = self.classifier.classify_many(articles)
+        for article, result in zip(articles, results):
             classified[result.section].append((article, result))
         
-        # Priorizar dentro de cada sección
-        for section in classified:
-            classified[section] = self.classifier.prioritize_articles(classified[section])
+        # Solo se resumen los 5 más prioritarios por sección; no hace falta ordenar el resto
+        selected = [
+            (section, article)
+            for section, items in classified.items()
+            for article, _ in self.classifier.top_articles(items, 5)
+        ]
         
-        return classified
-    
-    async def _generate_summaries(self, classified, izimedia_news):
-        """Generar resúmenes manteniendo URLs de IziMedia"""
-        articles_with_summaries = {}
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        summaries = await asyncio.gather(
+            *(self._summarize(article, semaphore) for _, article in selected)
+        )
         
-        # Crear mapeo de títulos a URLs de IziMedia
-        url_map = {news.title: news.url_izimedia for news in izimedia_news}
+        articles_with_summaries = {}
+        for (section, article), summary in zip(selected, summaries):
+            articles_with_summaries.setdefault(section, []).append((article, summary))
         
-        for section, items in classified.items():
-            if not items:
-                continue
-                
-            summaries = []
-            # Limitar a 5 por sección
-            for article, classification in items[:5]:
-                logger.info(f"   Generando resumen para: {article.title[:50]}...")
-                
-                # Generar resumen
-                summary = self.llm_processor.generate_article_summary(article)
-                
-                # Agregar fuente y fecha
-                source_date = f"({article.source}, {article.published_at.strftime('%d/%m')})"
-                summary_with_source = f"{summary} {source_date}"
-                
-                # Asegurar que usamos URL de IziMedia
-                if article.title in url_map:
-                    article.url = url_map[article.title]
-                
-                summaries.append((article, summary_with_source))
-            
-            if summaries:
-                articles_with_summaries[section] = summaries
+        return classified, articles_with_summaries
+    
+    async def _summarize(self, article, semaphore):
+        """Generar resumen de un artículo manteniendo la URL de IziMedia"""
+        # _convert_to_articles ya asigna url=news.url_izimedia a cada artículo
+        async with semaphore:
+            logger.info(f"   Generando resumen para: {article.title[:50]}...")
+            summary = await asyncio.to_thread(self.llm_processor.generate_article_summary, article)
         
-        return articles_with_summaries
+        # Agregar fuente y fecha
+        source_date = f"({article.source}, {article.published_at.strftime('%d/%m')})"
+        return f"{summary} {source_date}"
     
     def _generate_editorial(self, classified, izimedia_news):
         """Generar resumen editorial basado en noticias de IziMedia"""
@@ -222,11 +241,7 @@ class IziMediaNewsletterGenerator:
     
     def _create_izimedia_sources_section(self, izimedia_news):
         """Crear sección HTML con información de IziMedia"""
-        medios = {}
-        for news in izimedia_news:
-            if news.media not in medios:
-                medios[news.media] = 0
-            medios[news.media] += 1
+        medios = Counter(news.media for news in izimedia_news)
         
         html = """
         <div style="margin-top: 40px; padding: 20px; background-color: #f9f9f9; border-radius: 8px;">
@@ -262,7 +277,10 @@ async def main():
     """)
     
     generator = IziMediaNewsletterGenerator()
-    success = await generator.generate_newsletter()
+    try:
+        success = await generator.generate_newsletter()
+    finally:
+        await close_shared_client()
     
     if success:
         print("\n✅ Newsletter generado exitosamente con datos de IziMedia")
@@ -272,4 +290,7 @@ async def main():
         print("\n❌ Error generando el newsletter")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
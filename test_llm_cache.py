@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché persistente de respuestas del LLM
+"""
+from llm_cache import LLMCache
+
+def test_roundtrip_persists_across_instances(tmp_path):
+    path = tmp_path / "llm.sqlite"
+    key = LLMCache.make_key('article', 'ollama', 'gpt-oss:20b', 2, "https://df.cl/test")
+
+    cache = LLMCache(path)
+    assert cache.get(key) is None
+    cache.set(key, "Resumen de prueba")
+    cache.close()
+
+    reopened = LLMCache(path)
+    assert reopened.get(key) == "Resumen de prueba"
+    reopened.close()
+
+def test_make_key_separates_parts():
+    assert LLMCache.make_key("ab", "c") != LLMCache.make_key("a", "bc")
+    assert LLMCache.make_key("a", None) == LLMCache.make_key("a", "")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los resúmenes en lote del procesador LLM (sin llamadas reales al modelo)
+"""
+from datetime import datetime
+
+import pytest
+import requests
+
+import llm_processor
+from config import settings
+from llm_cache import LLMCache
+from llm_processor import LLMProcessor
+from models import Article
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    """Procesador Ollama sin verificación de conexión y con caché en tmp_path"""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", None)
+    monkeypatch.setattr(LLMProcessor, "_check_ollama_connection", lambda self: None)
+    monkeypatch.setattr(llm_processor, "open_cache", lambda: LLMCache(tmp_path / "llm.sqlite"))
+    return LLMProcessor()
+
+@pytest.fixture
+def articles():
+    now = datetime.now()
+    return [
+        Article(
+            url=f"https://df.cl/nota-{i}",
+            source="Diario Financiero",
+            title=f"Noticia {i}",
+            subtitle=None,
+            content=f"Contenido de la noticia {i}.",
+            published_at=now
+        )
+        for i in range(3)
+    ]
+
+def test_use_cache_false_never_opens_the_cache(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", None)
+    monkeypatch.setattr(LLMProcessor, "_check_ollama_connection", lambda self: None)
+
+    def fail_open_cache():
+        raise AssertionError("open_cache called with use_cache=False")
+    monkeypatch.setattr(llm_processor, "open_cache", fail_open_cache)
+
+    assert LLMProcessor(use_cache=False).cache is None
+
+def _fake_llm(monkeypatch, processor, batch_reply):
+    """Reemplazar _call_llm: el prompt en lote recibe batch_reply y los individuales 'Individual N'"""
+    prompts = []
+
+    def call_llm(prompt, max_tokens=None):
+        prompts.append(prompt)
+        if "Resúmenes:" in prompt:
+            return batch_reply(prompt) if callable(batch_reply) else batch_reply
+        return f"Individual {len(prompts) - 1}"
+
+    monkeypatch.setattr(processor, "_call_llm", call_llm)
+    return prompts
+
+def _cached(processor, articles):
+    return [processor._cache_get(processor._article_cache_key(article, 2)) for article in articles]
+
+def test_well_formed_reply(monkeypatch, processor, articles):
+    prompts = _fake_llm(monkeypatch, processor, "1. Resumen uno\n2. Resumen dos\n3. Resumen tres")
+
+    summaries = processor.generate_article_summaries_batch(articles)
+
+    assert summaries == ["Resumen uno", "Resumen dos", "Resumen tres"]
+    assert len(prompts) == 1
+    assert _cached(processor, articles) == summaries
+
+def test_reply_with_preamble(monkeypatch, processor, articles):
+    reply = "Aquí están los resúmenes solicitados:\n\n1) Resumen uno\n2) Resumen dos\n  3. Resumen tres\n"
+    prompts = _fake_llm(monkeypatch, processor, reply)
+
+    assert processor.generate_article_summaries_batch(articles) == ["Resumen uno", "Resumen dos", "Resumen tres"]
+    assert len(prompts) == 1
+
+def test_wrong_item_count_falls_back_to_single_calls(monkeypatch, processor, articles):
+    prompts = _fake_llm(monkeypatch, processor, "1. Resumen uno\n2. Resumen dos")
+
+    summaries = processor.generate_article_summaries_batch(articles)
+
+    assert summaries == ["Individual 1", "Individual 2", "Individual 3"]
+    assert len(prompts) == 1 + len(articles)
+    assert _cached(processor, articles) == summaries
+
+def test_mock_batch_reply_falls_back_to_single_calls(monkeypatch, processor, articles):
+    prompts = _fake_llm(monkeypatch, processor, processor._mock_response)
+
+    summaries = processor.generate_article_summaries_batch(articles)
+
+    assert summaries == ["Individual 1", "Individual 2", "Individual 3"]
+    assert len(prompts) == 1 + len(articles)
+
+def test_mock_response_is_not_cached(monkeypatch, processor, articles):
+    prompts = []
+
+    def call_llm(prompt, max_tokens=None):
+        prompts.append(prompt)
+        return processor._mock_response(prompt)
+
+    monkeypatch.setattr(processor, "_call_llm", call_llm)
+
+    summaries = processor.generate_article_summaries_batch(articles)
+
+    assert summaries == [processor._mock_response(prompts[-1])] * len(articles)
+    assert len(prompts) == 1 + len(articles)
+    assert _cached(processor, articles) == [None] * len(articles)
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {"response": self.text}
+
+def test_batch_timeout_falls_back_to_single_calls(monkeypatch, processor, articles):
+    timeouts = []
+
+    def post(url, data=None, headers=None, timeout=None):
+        timeouts.append(timeout)
+        if "Resúmenes:" in data.decode("utf-8"):
+            raise requests.exceptions.Timeout("read timed out")
+        return FakeResponse(f"Individual {len(timeouts) - 1}")
+
+    monkeypatch.setattr(llm_processor.requests, "post", post)
+
+    summaries = processor.generate_article_summaries_batch(articles)
+
+    assert summaries == ["Individual 1", "Individual 2", "Individual 3"]
+    assert _cached(processor, articles) == summaries
+    # El timeout crece con los tokens pedidos: el lote espera más que cada resumen individual
+    assert timeouts[0] == processor._request_timeout(200 * len(articles))
+    assert timeouts[0] > timeouts[1] == processor._request_timeout(200)
@@ -4,20 +4,30 @@ Script de prueba para el agente de clipping usando Ollama
 """
 import sys
 import os
-import pandas as pd
+import traceback
 from datetime import datetime
 
 # Agregar el directorio actual al path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Reemplazar el procesador LLM original con la versión de Ollama
+# Reemplazar el procesador LLM original con la versión de Ollama mientras se importan
+# los componentes, y restaurarlo después para no afectar a otros módulos (p. ej. con pytest)
 import llm_processor_ollama as llm_processor
+_original_llm_processor = sys.modules.get('llm_processor')
 sys.modules['llm_processor'] = llm_processor
 
 from models import Article
 from classifier import NewsClassifier, NewsSection
 from llm_processor_ollama import LLMProcessor
 
+if _original_llm_processor is not None:
+    sys.modules['llm_processor'] = _original_llm_processor
+else:
+    del sys.modules['llm_processor']
+
+# Chequeo TCP compartido (lee el puerto de settings.OLLAMA_URL); se importa ya restaurado el módulo real
+from llm_processor import ollama_up
+
 def test_ollama_integration():
     """Prueba la integración con Ollama"""
     
@@ -108,7 +118,6 @@ def test_ollama_integration():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
         traceback.print_exc()
     
     print("\n" + "="*60)
@@ -121,17 +130,20 @@ def test_ollama_integration():
     print("3. Ejecutar el agente completo")
 
 if __name__ == "__main__":
-    # Verificar que Ollama está corriendo
-    import subprocess
-    try:
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("❌ Ollama no está instalado o no está corriendo")
-            print("   Ejecuta: ollama serve")
+    # Verificar que Ollama está corriendo: chequeo TCP rápido, la CLI solo como respaldo
+    if not ollama_up():
+        import subprocess
+        try:
+            returncode = subprocess.call(
+                ['ollama', 'list'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            if returncode != 0:
+                print("❌ Ollama no está instalado o no está corriendo")
+                print("   Ejecuta: ollama serve")
+                sys.exit(1)
+        except FileNotFoundError:
+            print("❌ Ollama no está instalado")
+            print("   Instala desde: https://ollama.ai")
             sys.exit(1)
-    except FileNotFoundError:
-        print("❌ Ollama no está instalado")
-        print("   Instala desde: https://ollama.ai")
-        sys.exit(1)
     
     test_ollama_integration()
\ No newline at end of file
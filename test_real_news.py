@@ -3,14 +3,19 @@
 Script de prueba con noticias REALES
 """
 import asyncio
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
+import traceback
 import webbrowser
 
+import httpx
+
 from loguru import logger
+from config import settings
 from real_news_fetcher import RealNewsFetcher
-from classifier import NewsClassifier, NewsSection
-from llm_processor import LLMProcessor
+from classifier import NewsSection, get_classifier
+from llm_processor import get_llm_processor
 from newsletter_composer import NewsletterComposer
 from scraper import BancoCentralScraper, DuplicateDetector
 
@@ -19,10 +24,11 @@ logger.add("logs/test_real_{time}.log", rotation="1 day", level="INFO")
 
 class RealNewsClippingAgent:
     def __init__(self):
-        self.news_fetcher = RealNewsFetcher()
-        self.classifier = NewsClassifier()
-        self.llm_processor = LLMProcessor()
-        self.bc_scraper = BancoCentralScraper()
+        # news_fetcher y bc_scraper se crean en run_with_real_news con un cliente HTTP compartido
+        self.news_fetcher = None
+        self.bc_scraper = None
+        self.classifier = get_classifier()
+        self.llm_processor = get_llm_processor()
         self.duplicate_detector = DuplicateDetector()
         self.composer = NewsletterComposer()
         self.output_dir = Path("output")
@@ -34,10 +40,19 @@ class RealNewsClippingAgent:
         logger.info("📰 GENERACIÓN DE NEWSLETTER CON NOTICIAS REALES")
         logger.info("="*60)
         
+        # Un solo pool de conexiones para los feeds RSS y el Banco Central
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+            self.news_fetcher = RealNewsFetcher(client=client)
+            self.bc_scraper = BancoCentralScraper(client=client)
+            return await self._run_pipeline()
+    
+    async def _run_pipeline(self):
+        """Pasos del newsletter una vez configurados los clientes HTTP"""
         try:
             # PASO 1: Obtener noticias REALES
             logger.info("\n📥 PASO 1: Obteniendo noticias reales de fuentes RSS...")
-            articles = self.news_fetcher.fetch_all_news(days_back=3)  # Últimos 3 días
+            articles = await self.news_fetcher.fetch_all_news_async(days_back=3)  # Últimos 3 días
             
             if not articles:
                 logger.error("❌ No se pudieron obtener noticias reales")
@@ -46,14 +61,10 @@ class RealNewsClippingAgent:
             logger.info(f"   ✅ {len(articles)} noticias reales obtenidas")
             
             # Mostrar fuentes
-            sources = {}
-            for article in articles:
-                if article.source not in sources:
-                    sources[article.source] = 0
-                sources[article.source] += 1
+            source_counts = Counter(article.source for article in articles)
             
             logger.info("\n📊 Distribución por fuente:")
-            for source, count in sources.items():
+            for source, count in source_counts.most_common():
                 logger.info(f"   • {source}: {count} noticias")
             
             # PASO 2: Deduplicar
@@ -69,19 +80,15 @@ class RealNewsClippingAgent:
                 if items:
                     logger.info(f"   • {section.value}: {len(items)} noticias")
             
-            # PASO 4: Generar resúmenes
-            logger.info("\n✍️ PASO 4: Generando resúmenes con Ollama...")
-            articles_with_summaries = await self._generate_summaries(classified)
+            # PASOS 4-6: Resúmenes, indicadores y editorial son independientes entre sí
+            logger.info("\n✍️ PASOS 4-6: Generando resúmenes, indicadores y editorial en paralelo...")
+            articles_with_summaries, indicators, editorial = await asyncio.gather(
+                self._generate_summaries(classified),
+                self.bc_scraper.fetch_indicators(),
+                asyncio.to_thread(self.llm_processor.generate_editorial_summary, classified)
+            )
             logger.info("   ✅ Resúmenes generados")
-            
-            # PASO 5: Obtener indicadores económicos
-            logger.info("\n💹 PASO 5: Obteniendo indicadores económicos...")
-            indicators = await self.bc_scraper.fetch_indicators()
             logger.info(f"   ✅ Indicadores obtenidos")
-            
-            # PASO 6: Generar resumen editorial
-            logger.info("\n📝 PASO 6: Generando resumen editorial...")
-            editorial = self.llm_processor.generate_editorial_summary(classified)
             logger.info("   ✅ Resumen editorial generado")
             
             # Mostrar el editorial
@@ -92,43 +99,45 @@ class RealNewsClippingAgent:
             
             # PASO 7: Componer newsletter
             logger.info("\n📧 PASO 7: Componiendo newsletter HTML...")
-            html_content, text_content = self.composer.compose_newsletter(
-                editorial,
-                indicators,
-                articles_with_summaries
-            )
-            
-            # Agregar sección de fuentes consultadas
-            sources_html = self._create_sources_section(articles)
-            html_content = html_content.replace('</body>', f'{sources_html}</body>')
-            
-            # PASO 8: Guardar archivos
+            # PASO 8: Guardar archivos; HTML (directo al archivo) y texto se escriben en paralelo
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             html_file = self.output_dir / f"newsletter_real_{timestamp}.html"
             text_file = self.output_dir / f"newsletter_real_{timestamp}.txt"
             
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            with open(text_file, 'w', encoding='utf-8') as f:
-                f.write(text_content)
+            # Agregar sección de fuentes consultadas
+            sources_html = self._create_sources_section(source_counts)
+            await asyncio.gather(
+                asyncio.to_thread(
+                    self.composer.write_newsletter_html,
+                    editorial,
+                    indicators,
+                    articles_with_summaries,
+                    html_file,
+                    footer_html=sources_html
+                ),
+                asyncio.to_thread(
+                    self.composer.write_newsletter_text, editorial, indicators, articles_with_summaries, text_file
+                )
+            )
             
             logger.info(f"\n✅ Newsletter generado exitosamente:")
             logger.info(f"   • HTML: {html_file}")
             logger.info(f"   • Texto: {text_file}")
             
-            # Abrir en navegador
+            # Abrir en navegador en segundo plano mientras se muestran las estadísticas
             logger.info("\n🌐 Abriendo newsletter en el navegador...")
-            webbrowser.open(f"file://{html_file.absolute()}")
+            browser_task = asyncio.create_task(
+                asyncio.to_thread(webbrowser.open, f"file://{html_file.absolute()}")
+            )
             
             # Mostrar estadísticas
             self._show_statistics(classified, articles_with_summaries)
+            await browser_task
             
             return True
             
         except Exception as e:
             logger.error(f"\n❌ Error: {e}")
-            import traceback
             traceback.print_exc()
             return False
     
@@ -153,8 +162,8 @@ class RealNewsClippingAgent:
             NewsSection.SOCIOS: []
         }
         
-        for article in articles:
-            result = self.classifier.classify(article)
+        results = self.classifier.classify_many(articles)
+        for article, result in zip(articles, results):
             classified[result.section].append((article, result))
         
         # Priorizar dentro de cada sección
@@ -165,58 +174,51 @@ class RealNewsClippingAgent:
     
     async def _generate_summaries(self, classified):
         """Generar resúmenes para artículos"""
-        articles_with_summaries = {}
+        # Limitar a 5 por sección para la prueba; una llamada al LLM por sección, en paralelo
+        selected = {
+            section: [article for article, classification in items[:5]]
+            for section, items in classified.items()
+            if items
+        }
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        results = await asyncio.gather(
+            *(self._summarize_section(articles, semaphore) for articles in selected.values())
+        )
         
-        for section, items in classified.items():
-            if not items:
-                continue
-                
-            summaries = []
-            # Limitar a 5 por sección para la prueba
-            for article, classification in items[:5]:
+        return dict(zip(selected.keys(), results))
+    
+    async def _summarize_section(self, articles, semaphore):
+        """Generar en un solo lote los resúmenes de una sección, con fuente y fecha"""
+        async with semaphore:
+            for article in articles:
                 logger.info(f"   Generando resumen para: {article.title[:50]}...")
-                
-                # Generar resumen
-                summary = self.llm_processor.generate_article_summary(article)
-                
-                # Agregar fuente y fecha al resumen
-                source_date = f"({article.source}, {article.published_at.strftime('%d/%m')})"
-                summary_with_source = f"{summary} {source_date}"
-                
-                summaries.append((article, summary_with_source))
-            
-            if summaries:
-                articles_with_summaries[section] = summaries
+            summaries = await asyncio.to_thread(self.llm_processor.generate_article_summaries_batch, articles)
         
-        return articles_with_summaries
+        summaries_with_source = []
+        for article, summary in zip(articles, summaries):
+            # Agregar fuente y fecha al resumen
+            source_date = f"({article.source}, {article.published_at.strftime('%d/%m')})"
+            summaries_with_source.append((article, f"{summary} {source_date}"))
+        return summaries_with_source
     
-    def _create_sources_section(self, articles):
-        """Crear sección HTML con fuentes consultadas"""
-        sources = {}
-        for article in articles:
-            if article.source not in sources:
-                sources[article.source] = []
-            sources[article.source].append(article)
-        
-        html = """
+    def _create_sources_section(self, source_counts):
+        """Crear sección HTML con fuentes consultadas a partir del conteo por fuente"""
+        parts = ["""
         <div style="margin-top: 40px; padding: 20px; background-color: #f9f9f9; border-radius: 8px;">
             <h3 style="color: #004B87;">📚 Fuentes Consultadas</h3>
             <p style="font-size: 11pt; color: #666;">
-        """
-        
-        for source, source_articles in sources.items():
-            html += f"<strong>{source}</strong>: {len(source_articles)} noticias<br>"
-        
-        html += f"""
+        """]
+        parts.extend(f"<strong>{source}</strong>: {count} noticias<br>" for source, count in source_counts.items())
+        parts.append(f"""
             </p>
             <p style="font-size: 10pt; color: #999; margin-top: 15px;">
                 Noticias obtenidas de fuentes RSS públicas<br>
                 Fecha de consulta: {datetime.now().strftime("%d/%m/%Y %H:%M")}
             </p>
         </div>
-        """
+        """)
         
-        return html
+        return "".join(parts)
     
     def _show_statistics(self, classified, articles_with_summaries):
         """Mostrar estadísticas del newsletter"""
@@ -3,107 +3,285 @@
 Script de prueba para el agente de clipping sin necesidad de base de datos
 """
 import asyncio
+import hashlib
+import os
+import sys
+import time
 from datetime import datetime
-import pandas as pd
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 from loguru import logger
 
-from scraper import BancoCentralScraper
-from classifier import NewsClassifier
-from llm_processor import LLMProcessor
+from config import settings
 
-async def test_components():
-    """Prueba los componentes principales del sistema"""
+# pandas y los componentes se importan dentro de cada etapa: una etapa que falla
+# o no se usa no paga su importación, y el script arranca más rápido
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import uvloop  # Event loop basado en libuv (opcional, no disponible en Windows)
+except ImportError:
+    uvloop = None
+
+KEYWORDS_SHEET_CACHE_DIR = settings.DATA_DIR / "keywords_sheets"
+LOCAL_KEYWORDS_FILE = settings.DATA_DIR / "Palabras_Claves.xlsx"
+
+# Solo se lee la columna C (palabras clave), saltando el encabezado y las 2 filas de títulos.
+# Forma parte de la clave de la caché: cambiarla invalida las copias anteriores.
+KEYWORDS_COLUMN = 2
+KEYWORDS_SKIPROWS = 3
+
+# Artículos clasificados en lote en la etapa 1 para comparar con la clasificación individual
+CLASSIFIER_PROBE_BATCH = 50
+# Resúmenes pedidos en paralelo en la etapa 3
+LLM_PROBE_BATCH = 3
+
+# TEST_RUN_TIMINGS=1 agrega al informe de cada etapa el tiempo de sus llamadas principales
+TIMINGS_ENABLED = os.environ.get('TEST_RUN_TIMINGS', '').lower() in ('1', 'true', 'yes')
+
+def timed(lines: list[str], name: str, fn, *args, **kwargs):
+    """Ejecutar fn y, si las mediciones están activas, anotar su duración en lines"""
+    if not TIMINGS_ENABLED:
+        return fn(*args, **kwargs)
+    start = time.perf_counter_ns()
+    result = fn(*args, **kwargs)
+    lines.append(f"  [{name}] {(time.perf_counter_ns() - start) / 1e6:.1f} ms")
+    return result
+
+async def atimed(lines: list[str], name: str, fn, *args, **kwargs):
+    """Variante de timed para corrutinas"""
+    if not TIMINGS_ENABLED:
+        return await fn(*args, **kwargs)
+    start = time.perf_counter_ns()
+    result = await fn(*args, **kwargs)
+    lines.append(f"  [{name}] {(time.perf_counter_ns() - start) / 1e6:.1f} ms")
+    return result
+
+def resolve_keywords_file() -> Optional[Path]:
+    """Ubicar el Excel de palabras clave: KEYWORDS_XLSX, settings.KEYWORDS_FILE o data/Palabras_Claves.xlsx"""
+    for candidate in (os.environ.get('KEYWORDS_XLSX'), settings.KEYWORDS_FILE, LOCAL_KEYWORDS_FILE):
+        if candidate and os.path.exists(candidate):
+            return Path(candidate)
+    return None
+
+def read_keywords_sheet(path, sheet_name='ACAFI') -> 'pd.DataFrame':
+    """Leer la columna de palabras clave con el motor calamine (Rust) y usar openpyxl si no está disponible"""
+    import pandas as pd
     
-    print("="*60)
-    print("PRUEBA DE COMPONENTES - CLIPPING AGENT ACAFI")
-    print("="*60)
+    options = dict(
+        sheet_name=sheet_name,
+        usecols=[KEYWORDS_COLUMN],
+        skiprows=KEYWORDS_SKIPROWS,
+        header=None,
+        dtype=str
+    )
+    try:
+        return pd.read_excel(path, engine='calamine', **options)
+    except (ImportError, ValueError):
+        # ImportError: falta python-calamine; ValueError: pandas < 2.2 no conoce el motor
+        return pd.read_excel(path, engine='openpyxl', **options)
+
+def load_keywords_cached(path, sheet_name='ACAFI') -> 'pd.DataFrame':
+    """Leer la hoja de palabras clave, reutilizando una copia en pickle si el Excel no cambió"""
+    stat = os.stat(path)
+    key = hashlib.blake2b(
+        f"{path}:{sheet_name}:{KEYWORDS_COLUMN}:{KEYWORDS_SKIPROWS}:{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'),
+        digest_size=16
+    ).hexdigest()
+    cache_file = KEYWORDS_SHEET_CACHE_DIR / f"{key}.pkl"
+    
+    import pandas as pd
     
-    # 1. Probar lectura de palabras clave
-    print("\n1. PROBANDO CLASIFICADOR DE NOTICIAS")
-    print("-"*40)
+    if cache_file.exists():
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception as e:
+            logger.debug(f"Ignorando caché de palabras clave ilegible: {e}")
+    
+    df = read_keywords_sheet(path, sheet_name=sheet_name)
     try:
-        classifier = NewsClassifier()
-        
-        # Artículo de prueba
+        # Escribir a un temporal y reemplazar: otra ejecución nunca ve un pickle a medias
+        KEYWORDS_SHEET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        df.to_pickle(tmp_file)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.debug(f"No se pudo escribir la caché de palabras clave: {e}")
+    return df
+
+def _stage_classifier(article, keywords_file: Optional[Path]) -> list[str]:
+    """Etapa 1: clasificar el artículo de prueba"""
+    lines = ["\n1. PROBANDO CLASIFICADOR DE NOTICIAS", "-"*40]
+    try:
+        from classifier import NewsClassifier
         from models import Article
-        test_article = Article(
-            url="https://example.com/test",
-            source="Diario Financiero",
-            title="ACAFI lanza nuevo fondo de inversión para venture capital",
-            subtitle="La asociación busca impulsar el ecosistema de startups",
-            content="La Asociación Chilena de Administradoras de Fondos de Inversión (ACAFI) anunció hoy...",
-            published_at=datetime.now()
-        )
         
-        result = classifier.classify(test_article)
-        print(f"✓ Artículo clasificado como: {result.section.value}")
-        print(f"  Confianza: {result.confidence:.2%}")
-        print(f"  Menciona ACAFI: {result.mentions_acafi}")
-        print(f"  Tags: {', '.join(result.sector_tags)}")
+        # Sin Excel, el clasificador usa sus palabras clave por defecto
+        classifier = timed(lines, "NewsClassifier()", NewsClassifier, keywords_file=keywords_file)
+        start = time.perf_counter()
+        result = classifier.classify(article)
+        single_ms = (time.perf_counter() - start) * 1000
+        lines.append(f"✓ Artículo clasificado como: {result.section.value}")
+        lines.append(f"  Confianza: {result.confidence:.2%}")
+        lines.append(f"  Menciona ACAFI: {result.mentions_acafi}")
+        lines.append(f"  Tags: {', '.join(result.sector_tags)}")
+        
+        # Lote: variantes del artículo con título distinto, para no servirlas desde el memo de classify()
+        batch = [
+            Article(
+                url=f"{article.url}?batch={i}",
+                source=article.source,
+                title=f"{article.title} ({i})",
+                subtitle=article.subtitle,
+                content=article.content,
+                published_at=article.published_at
+            )
+            for i in range(CLASSIFIER_PROBE_BATCH)
+        ]
+        start = time.perf_counter()
+        results = classifier.classify_many(batch)
+        batch_ms = (time.perf_counter() - start) * 1000
+        consistent = all(r.section == result.section for r in results)
+        lines.append(
+            f"  Lote de {len(batch)}: {batch_ms:.1f} ms "
+            f"({batch_ms / len(batch):.2f} ms/artículo vs {single_ms:.2f} ms individual)"
+        )
+        lines.append(f"  Resultados del lote consistentes: {consistent}")
         
     except Exception as e:
-        print(f"✗ Error en clasificador: {e}")
-    
-    # 2. Probar indicadores económicos
-    print("\n2. PROBANDO SCRAPER DE BANCO CENTRAL")
-    print("-"*40)
+        lines.append(f"✗ Error en clasificador: {e}")
+    return lines
+
+async def _stage_bc() -> list[str]:
+    """Etapa 2: obtener indicadores del Banco Central"""
+    lines = ["\n2. PROBANDO SCRAPER DE BANCO CENTRAL", "-"*40]
     try:
+        from scraper import BancoCentralScraper
+        
         bc_scraper = BancoCentralScraper()
-        indicators = await bc_scraper.fetch_indicators()
+        indicators = await atimed(lines, "fetch_indicators", bc_scraper.fetch_indicators_cached)
         
-        print("✓ Indicadores obtenidos:")
+        lines.append("✓ Indicadores obtenidos:")
         for key, value in indicators.items():
-            print(f"  {key}: {value}")
+            lines.append(f"  {key}: {value}")
             
     except Exception as e:
-        print(f"✗ Error obteniendo indicadores: {e}")
-    
-    # 3. Probar generación de resúmenes (si hay API key configurada)
-    print("\n3. PROBANDO GENERADOR DE RESÚMENES LLM")
-    print("-"*40)
+        lines.append(f"✗ Error obteniendo indicadores: {e}")
+    return lines
+
+async def _timed_summary(llm, article) -> tuple[str, float]:
+    """Generar un resumen y medir su latencia en ms"""
+    start = time.perf_counter()
+    summary = await llm.agenerate_article_summary(article, max_lines=2)
+    return summary, (time.perf_counter() - start) * 1000
+
+async def _stage_llm(article) -> list[str]:
+    """Etapa 3: generar resúmenes (si hay API key configurada)"""
+    lines = ["\n3. PROBANDO GENERADOR DE RESÚMENES LLM", "-"*40]
     try:
-        llm = LLMProcessor()
+        from llm_processor import LLMProcessor
+        
+        # Sin caché persistente: los tiempos miden llamadas reales y la prueba no abre ni escribe
+        # data/llm_cache.sqlite
+        llm = await atimed(lines, "LLMProcessor()", asyncio.to_thread, LLMProcessor, use_cache=False)
         
         if llm.client:
-            summary = llm.generate_article_summary(test_article, max_lines=2)
-            print(f"✓ Resumen generado: {summary}")
+            summary = await atimed(lines, "generate_article_summary", llm.agenerate_article_summary, article, max_lines=2)
+            lines.append(f"✓ Resumen generado: {summary}")
+            
+            probes = [article] * LLM_PROBE_BATCH
+            start = time.perf_counter()
+            results = await asyncio.gather(*(_timed_summary(llm, probe) for probe in probes))
+            wall_ms = (time.perf_counter() - start) * 1000
+            latencies = ", ".join(f"{ms:.0f}" for _, ms in results)
+            lines.append(f"  Lote de {len(probes)} en paralelo: {wall_ms:.0f} ms total (por resumen: {latencies} ms)")
         else:
-            print("⚠ LLM no configurado (falta API key)")
-            print("  Usando respuestas mock para pruebas")
+            lines.append("⚠ LLM no configurado (falta API key)")
+            lines.append("  Usando respuestas mock para pruebas")
             
     except Exception as e:
-        print(f"✗ Error en LLM: {e}")
-    
-    # 4. Verificar archivo de palabras clave
-    print("\n4. VERIFICANDO ARCHIVO DE PALABRAS CLAVE")
-    print("-"*40)
+        lines.append(f"✗ Error en LLM: {e}")
+    return lines
+
+async def _stage_excel(file_path: Optional[Path]) -> list[str]:
+    """Etapa 4: verificar el archivo de palabras clave"""
+    lines = ["\n4. VERIFICANDO ARCHIVO DE PALABRAS CLAVE", "-"*40]
+    if file_path is None:
+        lines.append(f"✗ Archivo no encontrado: define KEYWORDS_XLSX o copia el Excel a {LOCAL_KEYWORDS_FILE}")
+        return lines
     try:
-        file_path = '/Users/alfil/Mi unidad/0_Consultorias/Proyecta/Palabras_Claves.xlsx'
-        df = pd.read_excel(file_path, sheet_name='ACAFI')
+        # Solo la lectura del Excel va a un hilo; el conteo es liviano y queda en el loop
+        df = await atimed(lines, "read_excel", asyncio.to_thread, load_keywords_cached, file_path, sheet_name='ACAFI')
         
-        print(f"✓ Archivo encontrado con {len(df)} filas")
-        print(f"  Columnas: {list(df.columns)}")
+        lines.append(f"✓ Archivo {file_path.name} encontrado con {len(df)} filas de palabras clave")
+        if df.shape[1] != 1 or df.empty:
+            lines.append(f"  ⚠ Forma inesperada de la columna de palabras clave: {df.shape}")
         
-        # Contar palabras clave
-        keyword_count = 0
-        for idx, row in df.iterrows():
-            if idx >= 2 and pd.notna(row.iloc[2]):
-                keywords = row.iloc[2].split('|')
-                keyword_count += len(keywords)
+        # Contar palabras clave: cada celda aporta count('|') + 1
+        keywords_col = df.iloc[:, 0].dropna()
+        keyword_count = int(keywords_col.str.count(r'\|').sum() + len(keywords_col))
         
-        print(f"  Total de palabras clave: {keyword_count}")
+        lines.append(f"  Total de palabras clave: {keyword_count}")
         
     except Exception as e:
-        print(f"✗ Error leyendo archivo: {e}")
+        lines.append(f"✗ Error leyendo archivo: {e}")
+    return lines
+
+def _emit(lines: list[str]):
+    """Escribir un bloque de líneas con una sola escritura a stdout"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+async def test_components():
+    """Prueba los componentes principales del sistema"""
+    
+    _emit(["="*60, "PRUEBA DE COMPONENTES - CLIPPING AGENT ACAFI", "="*60])
+    
+    from models import Article
+    
+    # Artículo de prueba compartido por el clasificador y el LLM
+    test_article = Article(
+        url="https://example.com/test",
+        source="Diario Financiero",
+        title="ACAFI lanza nuevo fondo de inversión para venture capital",
+        subtitle="La asociación busca impulsar el ecosistema de startups",
+        content="La Asociación Chilena de Administradoras de Fondos de Inversión (ACAFI) anunció hoy...",
+        published_at=datetime.now()
+    )
+    
+    keywords_file = resolve_keywords_file()
+    
+    # Las etapas son independientes: se ejecutan en paralelo y se informan en orden.
+    # Las llamadas bloqueantes (CPU, disco, cliente LLM síncrono) van a hilos.
+    start = time.perf_counter_ns()
+    reports = await asyncio.gather(
+        asyncio.to_thread(_stage_classifier, test_article, keywords_file),
+        _stage_bc(),
+        _stage_llm(test_article),
+        _stage_excel(keywords_file)
+    )
+    
+    # Cerrar el cliente HTTP compartido de la etapa 2 antes de que termine el event loop
+    from scraper import close_shared_client
+    await close_shared_client()
     
-    print("\n" + "="*60)
-    print("PRUEBA COMPLETADA")
-    print("="*60)
+    for lines in reports:
+        _emit(lines)
+    if TIMINGS_ENABLED:
+        _emit([f"\n[etapas en paralelo] {(time.perf_counter_ns() - start) / 1e6:.1f} ms"])
     
-    print("\nSIGUIENTES PASOS:")
-    print("1. Configurar las API keys en el archivo .env")
-    print("2. Configurar Mailchimp con las listas correctas")
-    print("3. Ejecutar el agente completo con: python main.py")
+    _emit([
+        "\n" + "="*60,
+        "PRUEBA COMPLETADA",
+        "="*60,
+        "\nSIGUIENTES PASOS:",
+        "1. Configurar las API keys en el archivo .env",
+        "2. Configurar Mailchimp con las listas correctas",
+        "3. Ejecutar el agente completo con: python main.py"
+    ])
 
 if __name__ == "__main__":
-    asyncio.run(test_components())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(test_components())
+    else:
+        asyncio.run(test_components())
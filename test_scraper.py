@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Pruebas del scraper del Banco Central (sin red)
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import scraper
+from config import settings
+from scraper import BancoCentralScraper, close_shared_client, get_shared_client
+
+INDICATORS = {'UF': '$39.360,32', 'Dólar Observado': '$967,48'}
+FALLBACK = {'UF': 'N/A', 'Dólar Observado': 'N/A'}
+
+@pytest.fixture
+def bc(tmp_path, monkeypatch):
+    """Scraper con caché en tmp_path y fetch_indicators simulado (cuenta las llamadas)"""
+    monkeypatch.setattr(BancoCentralScraper, "CACHE_FILE", tmp_path / "indicators_cache.json")
+    monkeypatch.setattr(settings, "ENABLE_CACHE", True)
+    bc_scraper = BancoCentralScraper()
+    bc_scraper.responses = [INDICATORS]
+    bc_scraper.calls = 0
+
+    async def fetch_indicators():
+        result = bc_scraper.responses[min(bc_scraper.calls, len(bc_scraper.responses) - 1)]
+        bc_scraper.calls += 1
+        return dict(result)
+
+    monkeypatch.setattr(bc_scraper, "fetch_indicators", fetch_indicators)
+    return bc_scraper
+
+def _fetch(bc_scraper):
+    return asyncio.run(bc_scraper.fetch_indicators_cached())
+
+def test_close_shared_client_closes_and_forgets_the_loop_client():
+    async def run():
+        client = get_shared_client()
+        assert get_shared_client() is client
+        await close_shared_client()
+        assert client.is_closed
+        assert asyncio.get_running_loop() not in scraper._shared_clients
+        await close_shared_client()  # Sin cliente no hace nada
+
+    asyncio.run(run())
+
+def test_same_day_hit_skips_fetch(bc):
+    assert _fetch(bc) == INDICATORS
+    assert _fetch(bc) == INDICATORS
+    assert bc.calls == 1
+    assert list(bc.CACHE_FILE.parent.glob("*.tmp")) == []
+
+def test_ttl_expiry_and_new_day_refetch(bc, monkeypatch):
+    today = datetime.now().strftime('%Y-%m-%d')
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    monkeypatch.setattr(settings, "INDICATORS_CACHE_TTL_SECONDS", 60)
+
+    bc.CACHE_FILE.write_text(json.dumps({'date': today, 'fetched_at': time.time() - 120, 'indicators': FALLBACK}))
+    assert _fetch(bc) == INDICATORS
+    assert bc.calls == 1
+
+    bc.CACHE_FILE.write_text(json.dumps({'date': yesterday, 'fetched_at': time.time(), 'indicators': FALLBACK}))
+    assert _fetch(bc) == INDICATORS
+    assert bc.calls == 2
+
+def test_fallback_values_are_not_cached(bc):
+    bc.responses = [FALLBACK, INDICATORS]
+    assert _fetch(bc) == FALLBACK
+    assert not bc.CACHE_FILE.exists()
+    assert _fetch(bc) == INDICATORS
+    assert _fetch(bc) == INDICATORS
+    assert bc.calls == 2
+
+@pytest.mark.parametrize("content", ["[1, 2]", '{"date": "x"}', '"texto"', "{no es json", '{"date": null, "fetched_at": 0}'])
+def test_unexpected_cache_shape_refetches(bc, content):
+    bc.CACHE_FILE.write_text(content)
+    assert _fetch(bc) == INDICATORS
+    assert bc.calls == 1
+    assert json.loads(bc.CACHE_FILE.read_text(encoding='utf-8'))['indicators'] == INDICATORS